@@ -0,0 +1,141 @@
+import os
+import threading
+import time
+from datetime import date
+
+import numpy as np
+
+from .hr_db import tables_version
+from .pmo_db import db_version
+from .project_config import docs_fingerprint
+from .vector_store import embeddings, index_version
+from .blocking import run_blocking
+
+
+# =========================
+# 의미 기반 답변 캐시
+#  - 질문 임베딩 cosine 유사도가 ANSWER_CACHE_THRESHOLD 이상이면 저장된 답변 재사용
+#  - ANSWER_CACHE_TTL 초가 지나면 만료
+#  - vector index / hr_policies 문서 / HR 표 / PMO DB 가 바뀌거나 날짜가 바뀌면 전체 무효화
+#    (프로젝트 지연 일수는 날짜에 따라 달라짐)
+#  - 질문만으로 매칭하므로 이전 대화가 없는 thread 의 첫 질문에만 사용 (main.py)
+# =========================
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "1") == "1"
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.95"))
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", "3600"))
+ANSWER_CACHE_MAX = int(os.getenv("ANSWER_CACHE_MAX", "500"))
+
+_lock = threading.Lock()
+_entries: list[dict] = []
+_matrix = None          # (n, dim) 정규화된 질문 벡터
+_version = None
+_stats = {"hits": 0, "misses": 0, "stores": 0, "invalidations": 0}
+
+
+def _data_version():
+    return index_version(), docs_fingerprint(), tables_version(), db_version(), date.today()
+
+
+def _normalize(vector) -> np.ndarray:
+    v = np.asarray(vector, dtype=np.float32)
+    return v / (np.linalg.norm(v) + 1e-12)
+
+
+def _rebuild_matrix():
+    global _matrix
+    _matrix = np.stack([e["vector"] for e in _entries]) if _entries else None
+
+
+def _check_version_locked(version):
+    global _version
+    if version != _version:
+        if _entries:
+            _stats["invalidations"] += 1
+        _entries.clear()
+        _rebuild_matrix()
+        _version = version
+
+
+def lookup(question: str, vector=None):
+    """
+    캐시 hit 이면 (entry, 질문 벡터), 아니면 (None, 질문 벡터).
+    vector: 이미 임베딩한 질문 벡터가 있으면 전달 (batch 엔드포인트)
+    질문 벡터는 store() 에 그대로 넘겨 재임베딩을 피한다.
+    """
+    if not ANSWER_CACHE_ENABLED:
+        return None, None
+
+    if vector is None:
+        vector = embeddings.embed_query(question)
+    vector = _normalize(vector)
+    version = _data_version()
+    now = time.time()
+
+    with _lock:
+        _check_version_locked(version)
+
+        # 만료 항목 정리
+        alive = [e for e in _entries if now - e["created_at"] < ANSWER_CACHE_TTL]
+        if len(alive) != len(_entries):
+            _entries[:] = alive
+            _rebuild_matrix()
+
+        if _matrix is not None:
+            sims = _matrix @ vector
+            best = int(np.argmax(sims))
+            if sims[best] >= ANSWER_CACHE_THRESHOLD:
+                _stats["hits"] += 1
+                entry = dict(_entries[best])
+                entry["similarity"] = float(sims[best])
+                return entry, vector
+
+        _stats["misses"] += 1
+        return None, vector
+
+
+def store(question: str, vector, response: dict):
+    if not ANSWER_CACHE_ENABLED or vector is None or not response.get("answer"):
+        return
+
+    version = _data_version()
+    with _lock:
+        _check_version_locked(version)
+        _entries.append({
+            "question": question,
+            "vector": vector,
+            "answer": response["answer"],
+            "sources": response.get("sources", []),
+            "graph_flow": response.get("graph_flow", []),
+            "created_at": time.time(),
+        })
+        if len(_entries) > ANSWER_CACHE_MAX:
+            del _entries[: len(_entries) - ANSWER_CACHE_MAX]
+        _rebuild_matrix()
+        _stats["stores"] += 1
+
+
+def clear():
+    with _lock:
+        _entries.clear()
+        _rebuild_matrix()
+
+
+def answer_cache_stats() -> dict:
+    with _lock:
+        return {
+            **_stats,
+            "entries": len(_entries),
+            "threshold": ANSWER_CACHE_THRESHOLD,
+            "ttl": ANSWER_CACHE_TTL,
+        }
+
+
+# =========================
+# async 진입점 (이벤트 루프에서 호출 → blocking pool 에서 실행)
+# =========================
+async def alookup(question: str, vector=None):
+    return await run_blocking(lookup, question, vector)
+
+
+async def astore(question: str, vector, response: dict):
+    return await run_blocking(store, question, vector, response)
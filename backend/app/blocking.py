@@ -0,0 +1,74 @@
+import asyncio
+import contextvars
+import functools
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+# =========================
+# 블로킹 작업 전용 thread pool
+#  - FAISS 검색, SQLite(PMO / HR 표), 규정 문서 스캔, 파일 추출 등 동기 작업은
+#    이벤트 루프에서 직접 호출하지 않고 run_blocking 으로 이 pool 에서 실행
+#  - 기본 executor(asyncio.to_thread) 와 분리해서 크기를 BLOCKING_POOL_WORKERS 로 고정
+#    → 인제스트/임베딩 같은 다른 스레드 작업과 서로 굶기지 않음
+# =========================
+BLOCKING_POOL_WORKERS = int(os.getenv("BLOCKING_POOL_WORKERS", "8"))
+
+_executor = ThreadPoolExecutor(max_workers=BLOCKING_POOL_WORKERS, thread_name_prefix="blocking")
+
+
+async def run_blocking(func, *args, **kwargs):
+    """func(*args, **kwargs) 를 blocking pool 에서 실행 (contextvars 유지)"""
+    ctx = contextvars.copy_context()
+    call = functools.partial(ctx.run, func, *args, **kwargs)
+    return await asyncio.get_running_loop().run_in_executor(_executor, call)
+
+
+def blocking_pool_stats() -> dict:
+    return {
+        "workers": BLOCKING_POOL_WORKERS,
+        "threads": len(_executor._threads),
+        "queued": _executor._work_queue.qsize(),
+    }
+
+
+# =========================
+# 이벤트 루프 지연(lag) 측정
+#  - LOOP_LAG_INTERVAL 초마다 sleep 후 실제로 깨어난 시각과의 차이를 기록
+#  - 이벤트 루프에서 블로킹 호출이 생기면 lag 이 바로 튀므로 회귀 감지용
+# =========================
+LOOP_LAG_INTERVAL = float(os.getenv("LOOP_LAG_INTERVAL", "0.5"))
+LOOP_LAG_WARN = float(os.getenv("LOOP_LAG_WARN", "0.2"))
+
+_lags = deque(maxlen=1200)
+_lag_max = {"value": 0.0}
+
+
+async def monitor_loop_lag():
+    while True:
+        started = time.perf_counter()
+        await asyncio.sleep(LOOP_LAG_INTERVAL)
+        lag = max(time.perf_counter() - started - LOOP_LAG_INTERVAL, 0.0)
+        _lags.append(lag)
+        _lag_max["value"] = max(_lag_max["value"], lag)
+        if lag > LOOP_LAG_WARN:
+            print(f"⚠️ EVENT LOOP LAG — {lag * 1000:.0f}ms")
+
+
+def loop_lag_stats() -> dict:
+    ordered = sorted(_lags)
+
+    def pct(q: float) -> float:
+        if not ordered:
+            return 0.0
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * q))] * 1000, 1)
+
+    return {
+        "samples": len(ordered),
+        "lag_ms_p50": pct(0.50),
+        "lag_ms_p95": pct(0.95),
+        "lag_ms_p99": pct(0.99),
+        "lag_ms_max": round(_lag_max["value"] * 1000, 1),
+    }
@@ -6,9 +6,18 @@ import pandas as pd
 
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_core.documents import Document
-from langchain_community.embeddings import OllamaEmbeddings
+from langchain_ollama import OllamaEmbeddings
 from langchain_community.vectorstores import FAISS
 
+try:
+    from .embedding_cache import CachedEmbeddings, cache_stats
+    from .embedding_pipeline import embed_into_faiss
+    from .text_extract import serialize_rows
+except ImportError:  # python build_vector_index.py 로 직접 실행하는 경우
+    from embedding_cache import CachedEmbeddings, cache_stats
+    from embedding_pipeline import embed_into_faiss
+    from text_extract import serialize_rows
+
 # =========================
 # 기본 설정
 # =========================
@@ -35,14 +44,7 @@ def load_excel_documents(excel_path: Path) -> list[str]:
 
     df = pd.read_excel(excel_path)
 
-    texts: list[str] = []
-    for _, row in df.iterrows():
-        row_text = " | ".join(
-            f"{col}: {row[col]}" for col in df.columns
-        )
-        texts.append(row_text)
-
-    return texts
+    return serialize_rows(df, sep=" | ").tolist()
 
 
 # =========================
@@ -79,14 +81,17 @@ def build_vector_index() -> None:
     # Ollama Embeddings
     # =========================
 
-    embeddings = OllamaEmbeddings(
+    embeddings = CachedEmbeddings(
+        OllamaEmbeddings(
+            model="nomic-embed-text",
+            base_url="http://localhost:11434",  # 기본값 (명시 권장)
+        ),
         model="nomic-embed-text",
-        base_url="http://localhost:11434",  # 기본값 (명시 권장)
     )
 
     print("🧠 Ollama 임베딩 생성 및 FAISS 인덱스 구축 중...")
     print("EMBEDDINGS TYPE:", type(embeddings))
-    db = FAISS.from_documents(docs, embeddings)
+    db = embed_into_faiss(docs, embeddings)
     db.save_local(INDEX_DIR)
 
     
@@ -94,6 +99,7 @@ def build_vector_index() -> None:
     print("📁 저장 위치:", INDEX_DIR.resolve())
     print("   - index.faiss")
     print("   - index.pkl")
+    print("🧠 임베딩 캐시:", cache_stats())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,218 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+import aiosqlite
+from langgraph.checkpoint.base import get_checkpoint_id
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+
+# =========================
+# LangGraph Checkpointer (SQLite + hot thread LRU)
+#  - 대화 state 는 checkpoints.db 에 저장 → 재시작 후에도 대화 유지, 프로세스 메모리 증가 없음
+#  - 최근 사용 thread 의 최신 checkpoint 만 메모리 LRU(CHECKPOINT_HOT_THREADS) 에 유지
+#  - CHECKPOINT_THREAD_TTL 초 동안 사용되지 않은 thread 는 삭제
+#  - thread 별로 최근 CHECKPOINT_KEEP_PER_THREAD 개 checkpoint 만 남기고 정리(compaction)
+# =========================
+STATE_DIR = Path(os.getenv("APP_STATE_DIR", Path(__file__).resolve().parent))
+CHECKPOINT_DB_FILE = STATE_DIR / "checkpoints.db"
+CHECKPOINT_HOT_THREADS = int(os.getenv("CHECKPOINT_HOT_THREADS", "256"))
+CHECKPOINT_THREAD_TTL = float(os.getenv("CHECKPOINT_THREAD_TTL", str(7 * 24 * 3600)))
+CHECKPOINT_KEEP_PER_THREAD = int(os.getenv("CHECKPOINT_KEEP_PER_THREAD", "5"))
+CHECKPOINT_MAINTENANCE_INTERVAL = float(os.getenv("CHECKPOINT_MAINTENANCE_INTERVAL", "600"))
+
+
+class BoundedSqliteSaver(AsyncSqliteSaver):
+    def __init__(self, conn, hot_threads: int = CHECKPOINT_HOT_THREADS):
+        super().__init__(conn)
+        self.hot_threads = hot_threads
+        self._hot: "OrderedDict[str, object]" = OrderedDict()
+        # thread 별 쓰기 세대 — 쓰기 시작/완료 시 증가.
+        # 조회 도중 세대가 바뀌면 (이전 row 를 읽었을 수 있으므로) 캐시에 넣지 않음
+        self._generation: dict[str, int] = {}
+        self.stats = {
+            "hot_hits": 0,
+            "hot_misses": 0,
+            "evicted_threads": 0,
+            "compacted_checkpoints": 0,
+        }
+
+    async def setup(self) -> None:
+        if self.is_setup:
+            return
+        await super().setup()
+        async with self.lock:
+            await self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS thread_activity (
+                thread_id TEXT PRIMARY KEY,
+                last_seen REAL
+            )
+            """)
+            await self.conn.commit()
+
+    # -------------------------------
+    # hot thread LRU (최신 checkpoint 조회만 캐시)
+    # -------------------------------
+    async def aget_tuple(self, config):
+        configurable = config["configurable"]
+        thread_id = str(configurable["thread_id"])
+        latest = not get_checkpoint_id(config) and not configurable.get("checkpoint_ns")
+
+        if latest and thread_id in self._hot:
+            self._hot.move_to_end(thread_id)
+            self.stats["hot_hits"] += 1
+            return self._hot[thread_id]
+
+        generation = self._generation.get(thread_id, 0)
+        checkpoint_tuple = await super().aget_tuple(config)
+
+        if (
+            latest
+            and checkpoint_tuple is not None
+            and self._generation.get(thread_id, 0) == generation
+        ):
+            self.stats["hot_misses"] += 1
+            self._hot[thread_id] = checkpoint_tuple
+            self._hot.move_to_end(thread_id)
+            while len(self._hot) > self.hot_threads:
+                self._hot.popitem(last=False)
+        return checkpoint_tuple
+
+    def _invalidate(self, thread_id: str):
+        self._generation[thread_id] = self._generation.get(thread_id, 0) + 1
+        self._hot.pop(thread_id, None)
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        thread_id = str(config["configurable"]["thread_id"])
+        self._invalidate(thread_id)
+        try:
+            next_config = await super().aput(config, checkpoint, metadata, new_versions)
+        finally:
+            # 쓰기 도중 시작된 조회가 이전 checkpoint 를 다시 캐시했을 수 있으므로 완료 후에도 무효화
+            self._invalidate(thread_id)
+        await self._touch(thread_id)
+        return next_config
+
+    async def aput_writes(self, config, writes, task_id, *args, **kwargs):
+        thread_id = str(config["configurable"]["thread_id"])
+        self._invalidate(thread_id)
+        try:
+            return await super().aput_writes(config, writes, task_id, *args, **kwargs)
+        finally:
+            self._invalidate(thread_id)
+
+    async def _touch(self, thread_id: str):
+        async with self.lock:
+            await self.conn.execute(
+                "INSERT OR REPLACE INTO thread_activity(thread_id, last_seen) VALUES (?, ?)",
+                (thread_id, time.time()),
+            )
+            await self.conn.commit()
+
+    # -------------------------------
+    # 유지보수 (idle thread 삭제 + checkpoint compaction)
+    # -------------------------------
+    async def evict_idle_threads(self, ttl: float = CHECKPOINT_THREAD_TTL) -> int:
+        await self.setup()
+        cutoff = time.time() - ttl
+        async with self.lock:
+            async with self.conn.execute(
+                "SELECT thread_id FROM thread_activity WHERE last_seen < ?", (cutoff,)
+            ) as cur:
+                idle = [row[0] for row in await cur.fetchall()]
+
+            for thread_id in idle:
+                self._hot.pop(thread_id, None)
+                self._generation.pop(thread_id, None)
+                await self.conn.execute("DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,))
+                await self.conn.execute("DELETE FROM writes WHERE thread_id = ?", (thread_id,))
+                await self.conn.execute("DELETE FROM thread_activity WHERE thread_id = ?", (thread_id,))
+            await self.conn.commit()
+
+        self.stats["evicted_threads"] += len(idle)
+        return len(idle)
+
+    async def compact(self, keep: int = CHECKPOINT_KEEP_PER_THREAD) -> int:
+        """
+        thread/namespace 별 최신 keep 개만 남김.
+        AgentState.messages 는 add_messages(DeltaChannel 아님)라서 checkpoint 마다
+        전체 state 가 저장되므로 이전 checkpoint 를 지워도 대화는 유지된다.
+        """
+        await self.setup()
+        async with self.lock:
+            cur = await self.conn.execute("""
+                DELETE FROM checkpoints WHERE rowid IN (
+                    SELECT rowid FROM (
+                        SELECT rowid, ROW_NUMBER() OVER (
+                            PARTITION BY thread_id, checkpoint_ns
+                            ORDER BY checkpoint_id DESC
+                        ) AS rn
+                        FROM checkpoints
+                    ) WHERE rn > ?
+                )
+            """, (keep,))
+            removed = cur.rowcount
+            await self.conn.execute("""
+                DELETE FROM writes WHERE NOT EXISTS (
+                    SELECT 1 FROM checkpoints c
+                    WHERE c.thread_id = writes.thread_id
+                      AND c.checkpoint_ns = writes.checkpoint_ns
+                      AND c.checkpoint_id = writes.checkpoint_id
+                )
+            """)
+            await self.conn.commit()
+
+        self.stats["compacted_checkpoints"] += max(removed, 0)
+        return removed
+
+    async def thread_count(self) -> int:
+        await self.setup()
+        async with self.lock:
+            async with self.conn.execute("SELECT COUNT(*) FROM thread_activity") as cur:
+                return (await cur.fetchone())[0]
+
+
+# =========================
+# 생성 / 유지보수 (FastAPI lifespan 에서 호출)
+#  - AsyncSqliteSaver 는 실행 중인 이벤트 루프가 필요하므로 import 시점이 아니라
+#    앱 시작 시 생성해서 graph.checkpointer 로 교체한다
+# =========================
+checkpointer = None
+
+
+async def open_checkpointer() -> BoundedSqliteSaver:
+    global checkpointer
+    conn = await aiosqlite.connect(str(CHECKPOINT_DB_FILE))
+    checkpointer = BoundedSqliteSaver(conn)
+    await checkpointer.setup()
+    return checkpointer
+
+
+async def close_checkpointer():
+    if checkpointer is not None:
+        await checkpointer.conn.close()
+
+
+async def run_checkpoint_maintenance():
+    """idle thread 삭제 + compaction 을 주기적으로 실행 (백그라운드 태스크)"""
+    while True:
+        await asyncio.sleep(CHECKPOINT_MAINTENANCE_INTERVAL)
+        try:
+            evicted = await checkpointer.evict_idle_threads()
+            compacted = await checkpointer.compact()
+            print(f"🧹 CHECKPOINT MAINTENANCE — idle thread {evicted}개 삭제 / checkpoint {compacted}개 정리")
+        except Exception as e:
+            print("⚠️ CHECKPOINT MAINTENANCE ERROR =>", e)
+
+
+async def checkpoint_stats() -> dict:
+    if checkpointer is None:
+        return {"backend": "memory"}
+    return {
+        "backend": "sqlite",
+        **checkpointer.stats,
+        "hot_threads": len(checkpointer._hot),
+        "threads": await checkpointer.thread_count(),
+    }
@@ -0,0 +1,167 @@
+import math
+import os
+import re
+
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    HumanMessage,
+    ToolMessage,
+)
+
+
+# =========================
+# summarize 프롬프트 context packing
+#  - num_ctx(4096) 안에서 num_predict 여유를 빼고 CONTEXT_TOKEN_BUDGET 만큼만 채움
+#  - 우선순위: system prompt → 현재 질문/지시 → 최신 tool 결과(질문과 관련 있는 줄 위주)
+#             → 이전 대화 (최근 턴부터)
+#  - 토크나이저 없이 대략적으로 계산 (한글 1자 ≈ 1 token, 그 외 약 4자 ≈ 1 token)
+# =========================
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "3300"))
+# 고정 항목을 뺀 나머지 중 tool 결과/검색 문서에 먼저 배정할 비율
+CONTEXT_EVIDENCE_SHARE = float(os.getenv("CONTEXT_EVIDENCE_SHARE", "0.75"))
+
+MESSAGE_OVERHEAD_TOKENS = 4
+OMITTED = "(길이 제한으로 생략)"
+
+_HANGUL = re.compile(r"[가-힣ㄱ-ㆎ]")
+_TERM = re.compile(r"[0-9A-Za-z가-힣]{2,}")
+
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    hangul = len(_HANGUL.findall(text))
+    return hangul + math.ceil((len(text) - hangul) / 4)
+
+
+def message_tokens(m: BaseMessage) -> int:
+    content = m.content if isinstance(m.content, str) else str(m.content)
+    return count_tokens(content) + MESSAGE_OVERHEAD_TOKENS
+
+
+def _terms(text: str) -> set:
+    return {t.lower() for t in _TERM.findall(text or "")}
+
+
+def trim_to_relevant_lines(text: str, question: str, max_tokens: int) -> str:
+    """
+    첫 줄(출처/제목)은 유지하고, 질문 단어가 많이 겹치는 줄부터 max_tokens 까지 채운다.
+    남은 줄은 원래 순서대로 출력.
+    """
+    if count_tokens(text) <= max_tokens:
+        return text
+    if max_tokens <= 0:
+        return ""
+
+    lines = text.splitlines()
+    terms = _terms(question)
+
+    def score(line: str) -> int:
+        lower = line.lower()
+        return sum(1 for t in terms if t in lower)
+
+    keep = {0}
+    used = count_tokens(lines[0]) + 1
+    ranked = sorted(
+        range(1, len(lines)),
+        key=lambda i: (-score(lines[i]), i),
+    )
+    for i in ranked:
+        if not lines[i].strip():
+            continue
+        cost = count_tokens(lines[i]) + 1
+        if used + cost > max_tokens:
+            continue
+        keep.add(i)
+        used += cost
+
+    if used > max_tokens:
+        # 첫 줄 자체가 너무 긴 경우 → 앞부분만
+        return lines[0][: max_tokens * 2]
+    return "\n".join(lines[i] for i in sorted(keep))
+
+
+def _with_content(m: BaseMessage, content: str) -> BaseMessage:
+    return m.model_copy(update={"content": content})
+
+
+def pack_context(
+    system_msg: BaseMessage,
+    instruction_msg: BaseMessage,
+    question: str,
+    history: list,
+    turn: list,
+    evidence: list,
+    budget: int = CONTEXT_TOKEN_BUDGET,
+) -> list:
+    """
+    history: 이번 턴 이전 메시지
+    turn: 이번 턴 메시지 (HumanMessage 질문 + agent tool_calls + ToolMessage 들)
+    evidence: 프롬프트에만 넣는 추가 근거 메시지 (vector fallback)
+    반환: LLM 에 넘길 메시지 목록
+    """
+    fixed = [system_msg, instruction_msg]
+    used = sum(message_tokens(m) for m in fixed)
+
+    # 현재 질문 / tool_calls AIMessage 는 그대로 유지 (ToolMessage 짝을 맞추기 위함)
+    turn_fixed = [m for m in turn if not isinstance(m, ToolMessage)]
+    used += sum(message_tokens(m) for m in turn_fixed)
+
+    remaining = max(budget - used, 0)
+    evidence_budget = int(remaining * CONTEXT_EVIDENCE_SHARE)
+
+    # -------------------------------
+    # 1) 최신 tool 결과 / 검색 근거 (최신 것부터, 남은 몫을 다음 항목으로 이월)
+    # -------------------------------
+    tool_msgs = [m for m in turn if isinstance(m, ToolMessage)]
+    evidence_items = list(reversed(tool_msgs)) + list(reversed(evidence))
+    packed = {}
+    dropped_tokens = 0
+    trimmed = 0
+
+    for n, m in enumerate(evidence_items):
+        share = evidence_budget // (len(evidence_items) - n)
+        original = m.content if isinstance(m.content, str) else str(m.content)
+        content = trim_to_relevant_lines(original, question, share - MESSAGE_OVERHEAD_TOKENS)
+        if content != original:
+            trimmed += 1
+            dropped_tokens += count_tokens(original) - count_tokens(content)
+        content = content or OMITTED
+        packed[id(m)] = _with_content(m, content)
+        cost = count_tokens(content) + MESSAGE_OVERHEAD_TOKENS
+        evidence_budget -= cost
+        remaining -= cost
+
+    # -------------------------------
+    # 2) 이전 대화 (최근 턴부터, 질문/답변 텍스트만)
+    #    - 이전 턴의 tool_calls / ToolMessage 는 짝이 깨질 수 있으므로 제외
+    # -------------------------------
+    older = [
+        m for m in history
+        if isinstance(m, (HumanMessage, AIMessage)) and not getattr(m, "tool_calls", None)
+        and m.content
+    ]
+    kept_history = []
+    dropped_messages = 0
+    for m in reversed(older):
+        cost = message_tokens(m)
+        if cost > remaining:
+            dropped_messages += 1
+            dropped_tokens += cost
+            continue
+        kept_history.insert(0, m)
+        remaining -= cost
+
+    # 대화 순서 유지: 이전 대화 → 이번 턴(질문, tool 결과) → 검색 근거 → 최종 지시
+    messages = [system_msg] + kept_history
+    messages += [packed.get(id(m), m) for m in turn]
+    messages += [packed[id(m)] for m in evidence]
+    messages.append(instruction_msg)
+
+    total = sum(message_tokens(m) for m in messages)
+    print(
+        f"📦 CONTEXT PACK — {total}/{budget} tokens / 생략 {dropped_tokens} tokens "
+        f"(잘린 근거 {trimmed}개, 제외된 이전 메시지 {dropped_messages}개)"
+    )
+    return messages
@@ -0,0 +1,205 @@
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+
+# =========================
+# 임베딩 캐시 (SQLite)
+#  - key: (모델명@Ollama 주소, chunk 텍스트 sha256)
+#    → fake Ollama(벤치마크) 벡터가 실제 모델 벡터로 재사용되지 않음
+#  - value: float32 벡터 BLOB
+#  - 행 수가 EMBED_CACHE_MAX_ROWS 를 넘으면 가장 오래 안 쓰인 항목부터 삭제(LRU)
+# =========================
+# APP_STATE_DIR: 캐시/DB/인덱스를 다른 디렉터리에 두고 싶을 때 (벤치마크 등)
+STATE_DIR = Path(os.getenv("APP_STATE_DIR", Path(__file__).resolve().parent))
+CACHE_FILE = STATE_DIR / "embedding_cache.db"
+EMBED_CACHE_MAX_ROWS = int(os.getenv("EMBED_CACHE_MAX_ROWS", "200000"))
+
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "evicted": 0}
+
+
+def _get_conn():
+    conn = sqlite3.connect(CACHE_FILE, timeout=30)
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS embeddings (
+        model TEXT,
+        text_hash TEXT,
+        vector BLOB,
+        last_used REAL,
+        PRIMARY KEY (model, text_hash)
+    )
+    """)
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings(last_used)"
+    )
+    return conn
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def lookup(model: str, hashes: list[str]) -> dict[str, list[float]]:
+    """캐시에 있는 벡터만 {hash: vector} 로 반환하고 last_used 를 갱신"""
+    found: dict[str, list[float]] = {}
+    if not hashes:
+        return found
+
+    unique = list(dict.fromkeys(hashes))
+    with _lock:
+        conn = _get_conn()
+        try:
+            # SQLite 변수 개수 제한(999)을 넘지 않도록 나눠서 조회
+            for i in range(0, len(unique), 500):
+                part = unique[i:i + 500]
+                marks = ",".join("?" * len(part))
+                rows = conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings "
+                    f"WHERE model = ? AND text_hash IN ({marks})",
+                    [model, *part],
+                ).fetchall()
+                for h, blob in rows:
+                    found[h] = np.frombuffer(blob, dtype=np.float32).tolist()
+
+            if found:
+                now = time.time()
+                conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE model = ? AND text_hash = ?",
+                    [(now, model, h) for h in found],
+                )
+                conn.commit()
+        finally:
+            conn.close()
+    return found
+
+
+def store(model: str, items: dict[str, list[float]]):
+    """새로 계산한 벡터 저장 후 용량 초과분 LRU 삭제"""
+    if not items:
+        return
+
+    now = time.time()
+    with _lock:
+        conn = _get_conn()
+        try:
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings(model, text_hash, vector, last_used) "
+                "VALUES (?, ?, ?, ?)",
+                [
+                    (model, h, np.asarray(v, dtype=np.float32).tobytes(), now)
+                    for h, v in items.items()
+                ],
+            )
+
+            total = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            overflow = total - EMBED_CACHE_MAX_ROWS
+            if overflow > 0:
+                conn.execute(
+                    "DELETE FROM embeddings WHERE rowid IN ("
+                    " SELECT rowid FROM embeddings ORDER BY last_used ASC LIMIT ?"
+                    ")",
+                    (overflow,),
+                )
+                _stats["evicted"] += overflow
+            conn.commit()
+        finally:
+            conn.close()
+
+
+def cache_stats() -> dict:
+    with _lock:
+        stats = dict(_stats)
+        conn = _get_conn()
+        try:
+            stats["rows"] = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        finally:
+            conn.close()
+    stats["max_rows"] = EMBED_CACHE_MAX_ROWS
+    return stats
+
+
+# =========================
+# 캐시 래퍼 Embeddings
+#  - 인덱스 빌더는 OllamaEmbeddings 대신 이 객체를 사용
+#  - inner 는 langchain_ollama.OllamaEmbeddings → 텍스트 여러 개를 /api/embed 요청 1번으로 보냄
+#  - 질의/문서 instruction("query: " / "passage: ") 은 여기서 붙임
+#    (langchain_community OllamaEmbeddings 와 같은 벡터 → 기존 인덱스/캐시 그대로 사용)
+#  - embed_documents / aembed_documents: 캐시 hit 은 건너뛰고 miss 만 Ollama 호출
+#  - embed_query: 검색 질의는 캐시하지 않고 그대로 위임
+#  - embed_queries: 검색 질의 여러 개를 한 번에 (batch 질문 엔드포인트)
+# =========================
+DOCUMENT_INSTRUCTION = "passage: "
+QUERY_INSTRUCTION = "query: "
+
+
+class CachedEmbeddings(Embeddings):
+    def __init__(self, inner: Embeddings, model: str):
+        self.inner = inner
+        base_url = getattr(inner, "base_url", None)
+        self.model = f"{model}@{base_url}" if base_url else model
+
+    def _split(self, hashes: list[str], texts: list[str], cached: dict) -> dict[str, str]:
+        """캐시에 없는 텍스트만 {hash: text} 로 (중복 제거)"""
+        missing: dict[str, str] = {}
+        for h, t in zip(hashes, texts):
+            if h not in cached and h not in missing:
+                missing[h] = t
+        return missing
+
+    def _record(self, total: int, missing: int):
+        with _lock:
+            _stats["hits"] += total - missing
+            _stats["misses"] += missing
+        print(f"🧠 EMBEDDING CACHE — skip {total - missing} / embed {missing}")
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        hashes = [text_hash(t) for t in texts]
+        cached = lookup(self.model, hashes)
+
+        missing = self._split(hashes, texts, cached)
+        if missing:
+            vectors = self.inner.embed_documents(
+                [DOCUMENT_INSTRUCTION + t for t in missing.values()]
+            )
+            fresh = dict(zip(missing.keys(), vectors))
+            store(self.model, fresh)
+            cached.update(fresh)
+
+        self._record(len(texts), len(missing))
+        return [cached[h] for h in hashes]
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        # 인제스트 파이프라인용: 캐시 조회/저장(SQLite)은 스레드에서,
+        # miss 는 inner 의 async 클라이언트로 요청 1번에 임베딩
+        hashes = [text_hash(t) for t in texts]
+        cached = await asyncio.to_thread(lookup, self.model, hashes)
+
+        missing = self._split(hashes, texts, cached)
+        if missing:
+            vectors = await self.inner.aembed_documents(
+                [DOCUMENT_INSTRUCTION + t for t in missing.values()]
+            )
+            fresh = dict(zip(missing.keys(), vectors))
+            await asyncio.to_thread(store, self.model, fresh)
+            cached.update(fresh)
+
+        self._record(len(texts), len(missing))
+        return [cached[h] for h in hashes]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.inner.embed_documents([QUERY_INSTRUCTION + text])[0]
+
+    def embed_queries(self, texts: list[str]) -> list[list[float]]:
+        # 같은 질의는 한 번만, 서로 다른 질의는 요청 1번으로 임베딩
+        unique = list(dict.fromkeys(texts))
+        vectors = self.inner.embed_documents([QUERY_INSTRUCTION + t for t in unique])
+        by_text = dict(zip(unique, vectors))
+        return [by_text[t] for t in texts]
@@ -0,0 +1,111 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_community.vectorstores import FAISS
+
+
+# =========================
+# 배치 + 동시 임베딩 파이프라인
+#  - chunk 를 EMBED_BATCH_SIZE 단위로 묶어 Ollama 에 요청
+#    (CachedEmbeddings.aembed_documents → 배치당 /api/embed 요청 1번, 캐시 hit 은 제외)
+#  - 동시에 날아가는 배치 요청은 EMBED_MAX_IN_FLIGHT 개로 제한
+#  - 실패한 배치는 EMBED_MAX_RETRIES 회까지 지수 백오프 재시도
+#  - 끝난 배치부터 바로 FAISS 인덱스에 추가 (전체 완료를 기다리지 않음)
+# =========================
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "32"))
+EMBED_MAX_IN_FLIGHT = int(os.getenv("EMBED_MAX_IN_FLIGHT", "4"))
+EMBED_MAX_RETRIES = int(os.getenv("EMBED_MAX_RETRIES", "3"))
+
+ProgressCallback = Callable[[int, int], None]
+
+
+async def _embed_with_retry(embeddings: Embeddings, texts: list[str]) -> list[list[float]]:
+    delay = 1.0
+    for attempt in range(EMBED_MAX_RETRIES + 1):
+        try:
+            return await embeddings.aembed_documents(texts)
+        except Exception as e:
+            if attempt == EMBED_MAX_RETRIES:
+                raise
+            print(f"⚠️ EMBED BATCH RETRY {attempt + 1}/{EMBED_MAX_RETRIES} =>", e)
+            await asyncio.sleep(delay)
+            delay *= 2
+
+
+async def aembed_into_faiss(
+    docs: list[Document],
+    embeddings: Embeddings,
+    db: Optional[FAISS] = None,
+    batch_size: int = EMBED_BATCH_SIZE,
+    max_in_flight: int = EMBED_MAX_IN_FLIGHT,
+    on_progress: Optional[ProgressCallback] = None,
+) -> Optional[FAISS]:
+    """
+    docs 를 임베딩해서 db 에 추가한다. db 가 없으면 첫 배치로 새로 만든다.
+    on_progress(임베딩 완료 chunk 수, 전체 chunk 수) 는 배치가 끝날 때마다 호출.
+    """
+    if not docs:
+        return db
+
+    started = time.perf_counter()
+    batches = [docs[i:i + batch_size] for i in range(0, len(docs), batch_size)]
+    semaphore = asyncio.Semaphore(max_in_flight)
+
+    async def run(batch: list[Document]):
+        async with semaphore:
+            vectors = await _embed_with_retry(
+                embeddings, [d.page_content for d in batch]
+            )
+        return batch, vectors
+
+    tasks = [asyncio.create_task(run(b)) for b in batches]
+    done = 0
+    try:
+        for fut in asyncio.as_completed(tasks):
+            batch, vectors = await fut
+            text_embeddings = list(zip([d.page_content for d in batch], vectors))
+            metadatas = [d.metadata for d in batch]
+
+            if db is None:
+                db = FAISS.from_embeddings(text_embeddings, embeddings, metadatas=metadatas)
+            else:
+                db.add_embeddings(text_embeddings, metadatas=metadatas)
+
+            done += len(batch)
+            if on_progress:
+                on_progress(done, len(docs))
+    except BaseException:
+        for t in tasks:
+            t.cancel()
+        raise
+
+    elapsed = time.perf_counter() - started
+    print(
+        f"✅ EMBED PIPELINE — {len(docs)} chunks / {len(batches)} batches "
+        f"/ {elapsed:.1f}s ({len(docs) / max(elapsed, 1e-6):.1f} chunks/s)"
+    )
+    return db
+
+
+def embed_into_faiss(
+    docs: list[Document],
+    embeddings: Embeddings,
+    db: Optional[FAISS] = None,
+    **kwargs,
+) -> Optional[FAISS]:
+    """동기 코드(인덱스 빌더 스크립트, 워커 스레드)에서 쓰는 진입점"""
+    coro = aembed_into_faiss(docs, embeddings, db=db, **kwargs)
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    # 이미 이벤트 루프 안에서 호출된 경우 → 별도 스레드에서 새 루프로 실행
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, coro).result()
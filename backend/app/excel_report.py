@@ -2,6 +2,8 @@ from openpyxl import Workbook
 from pathlib import Path
 import pandas as pd
 
+from .text_extract import serialize_rows
+
 BASE_DIR = Path(__file__).resolve().parent
 REPORT_DIR = BASE_DIR / "reports"
 REPORT_DIR.mkdir(exist_ok=True)
@@ -30,9 +32,4 @@ def create_excel_report(project_name: str, body_text: str):
 def excel_to_text(file_path: str) -> list[str]:
     df = pd.read_excel(file_path)
 
-    texts = []
-    for _, row in df.iterrows():
-        text = " | ".join([f"{col}: {row[col]}" for col in df.columns])
-        texts.append(text)
-
-    return texts
\ No newline at end of file
+    return serialize_rows(df, sep=" | ").tolist()
\ No newline at end of file
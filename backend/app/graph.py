@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+import asyncio
+import os
+import time
 from typing import Annotated, List, Literal
 from typing_extensions import TypedDict
 
@@ -11,13 +14,26 @@ from langchain_core.messages import (
     HumanMessage,
     SystemMessage,
     AIMessage,
+    ToolMessage,
+    RemoveMessage,
 )
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import StateGraph, START, END
 from langgraph.graph.message import add_messages
-from langgraph.prebuilt import ToolNode
 from langgraph.checkpoint.memory import MemorySaver
 
-from .project_config import SYSTEM_PROMPT, search_docs, analyze_project_status
+from .project_config import (
+    SYSTEM_PROMPT,
+    search_docs,
+    analyze_project_status,
+    aggregate_hr_data,
+    query_terms,
+)
+from .vector_store import get_vector_store, abatch_similarity_search, OLLAMA_BASE_URL
+from .query_router import route_question
+from .context_packer import pack_context
+from .llm_scheduler import call_llm
+from .blocking import run_blocking
 
 
 # =========================
@@ -25,13 +41,78 @@ from .project_config import SYSTEM_PROMPT, search_docs, analyze_project_status
 # =========================
 class AgentState(TypedDict):
     messages: Annotated[List[BaseMessage], add_messages]
+    # 이번 턴 vector fallback 검색 결과 (턴마다 엔드포인트가 [] 로 초기화)
+    fallback_sources: list
+    # agent LLM 호출과 동시에 미리 실행한 검색 결과 {"question", "vector", "keyword"}
+    prefetched: dict
+    # fast-path router 결과 {"target", "method", "intent", "tool_calls"}
+    route: dict
+    # 오래된 턴을 압축한 누적 대화 요약 (memory 노드가 갱신)
+    summary: str
+    # 이번 턴 tool 실행 시간 [{"tool", "ms", "status"}] (턴마다 엔드포인트가 [] 로 초기화)
+    tool_timings: list
 
 
 # =========================
 # Tools
+#  - 한 AIMessage 의 tool_calls 를 동시에 실행 (최대 TOOL_MAX_CONCURRENCY 개)
+#  - tool 은 모두 async (실제 조회는 blocking pool) → 서로/이벤트 루프를 막지 않음
+#  - tool 별 실행 시간은 tool_timings 로 남겨 graph_flow 에 표시
 # =========================
-tools = [search_docs, analyze_project_status]
-tool_node = ToolNode(tools)
+tools = [search_docs, analyze_project_status, aggregate_hr_data]
+tools_by_name = {t.name: t for t in tools}
+
+TOOL_MAX_CONCURRENCY = int(os.getenv("TOOL_MAX_CONCURRENCY", "4"))
+
+
+async def _run_tool_call(call: dict, semaphore: asyncio.Semaphore, config: RunnableConfig):
+    tool = tools_by_name.get(call["name"])
+    async with semaphore:
+        started = time.perf_counter()
+        if tool is None:
+            message = ToolMessage(
+                content=f"Error: '{call['name']}' 는 사용할 수 없는 tool 입니다.",
+                name=call["name"],
+                tool_call_id=call["id"],
+                status="error",
+            )
+        else:
+            try:
+                # ToolCall 형태로 호출하면 content + artifact 를 가진 ToolMessage 가 반환됨
+                message = await tool.ainvoke({**call, "type": "tool_call"}, config)
+            except Exception as e:
+                message = ToolMessage(
+                    content=f"Error: {e}",
+                    name=call["name"],
+                    tool_call_id=call["id"],
+                    status="error",
+                )
+        elapsed_ms = round((time.perf_counter() - started) * 1000)
+
+    return message, {
+        "tool": call["name"],
+        "ms": elapsed_ms,
+        "status": getattr(message, "status", "success"),
+    }
+
+
+async def tools_node(state: AgentState, config: RunnableConfig) -> AgentState:
+    calls = state["messages"][-1].tool_calls
+    semaphore = asyncio.Semaphore(TOOL_MAX_CONCURRENCY)
+
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *(_run_tool_call(call, semaphore, config) for call in calls)
+    )
+    timings = [t for _, t in results]
+    print(
+        f"🔧 TOOLS — {len(calls)}개 / {(time.perf_counter() - started) * 1000:.0f}ms "
+        + ", ".join(f"{t['tool']} {t['ms']}ms" for t in timings)
+    )
+    return {
+        "messages": [m for m, _ in results],
+        "tool_timings": timings,
+    }
 
 
 # =========================
@@ -41,18 +122,56 @@ tool_node = ToolNode(tools)
 # =========================
 agent_llm = ChatOllama(
     model="qwen2.5:3b",
-    base_url="http://localhost:11434",
+    base_url=OLLAMA_BASE_URL,
     temperature=0,
     num_ctx=4096,
     num_predict=512,  # ⭐ 중요: 응답 길이 제한
 ).bind_tools(tools)   # ⭐ 중요: tool_calls 생성 가능하게
 
 
+# 대화 요약 전용 (tool 바인딩 없음, 짧게)
+summary_llm = ChatOllama(
+    model="qwen2.5:3b",
+    base_url=OLLAMA_BASE_URL,
+    temperature=0,
+    num_ctx=4096,
+    num_predict=256,
+)
+
+
 # =========================
 # Routing
-#  - tool_calls 있으면 tools로
-#  - 없으면 summarize로 종료
+#  - agent: tool_calls 있으면 tools로
+#  - tools 실행 후에는 agent 로 돌아가지 않고 바로 summarize (LLM 호출 최대 2회)
+#  - 근거 문서가 하나도 없으면 summarize 전에 vector_fallback
 # =========================
+def current_turn_messages(messages: list) -> list:
+    """마지막 HumanMessage 이후(이번 턴) 메시지"""
+    for i in range(len(messages) - 1, -1, -1):
+        if isinstance(messages[i], HumanMessage):
+            return messages[i + 1 :]
+    return []
+
+
+def current_question(messages: list) -> str:
+    for m in reversed(messages):
+        if isinstance(m, HumanMessage):
+            return m.content
+    return ""
+
+
+def _turn_has_documents(messages: list) -> bool:
+    for m in current_turn_messages(messages):
+        artifact = getattr(m, "artifact", None)
+        if isinstance(m, ToolMessage) and isinstance(artifact, dict) and artifact.get("documents"):
+            return True
+    return False
+
+
+def route_after_router(state):
+    return state["route"]["target"]
+
+
 def route_after_agent(state):
     last_msg = state["messages"][-1]
 
@@ -60,39 +179,249 @@ def route_after_agent(state):
     if getattr(last_msg, "tool_calls", None):
         return "tools"
 
-    # tool 호출이 없으면 요약 후 종료
-    return "summarize"
+    return route_after_tools(state)
+
+
+def route_after_tools(state):
+    if _turn_has_documents(state["messages"]):
+        return "summarize"
+    return "vector_fallback"
+
+
+# =========================
+# Conversation memory
+#  - 이전 턴이 MEMORY_MAX_TURNS 를 넘으면 최근 MEMORY_KEEP_TURNS 턴만 원문으로 남기고
+#    나머지는 누적 요약(summary)에 합친 뒤 state 에서 삭제
+#  - 요약은 기존 요약 + 새로 밀려난 턴만 넣어 갱신 (매 턴 전체를 다시 요약하지 않음)
+#  - thread 가 길어져도 agent / summarize 프롬프트 크기가 거의 일정하게 유지됨
+# =========================
+MEMORY_MAX_TURNS = int(os.getenv("MEMORY_MAX_TURNS", "8"))
+MEMORY_KEEP_TURNS = int(os.getenv("MEMORY_KEEP_TURNS", "3"))
+MEMORY_MESSAGE_CHARS = 500
+
+SUMMARY_PROMPT = """너는 사내 HR 비서와 사용자의 대화를 요약하는 역할이다.
+기존 요약과 새 대화를 합쳐 하나의 요약으로 갱신하라.
+- 사용자가 물어본 주제, 확인된 사실/수치, 언급된 프로젝트/부서/규정 이름을 유지
+- 10줄 이내 bullet, 한국어
+"""
+
+
+def _render_turns(messages: list) -> str:
+    lines = []
+    for m in messages:
+        content = m.content if isinstance(m.content, str) else str(m.content)
+        content = content[:MEMORY_MESSAGE_CHARS]
+        if isinstance(m, HumanMessage):
+            lines.append(f"사용자: {content}")
+        elif isinstance(m, ToolMessage):
+            lines.append(f"[{m.name} 결과] {content}")
+        elif isinstance(m, AIMessage) and content:
+            lines.append(f"비서: {content}")
+    return "\n".join(lines)
+
+
+def with_summary(state: AgentState, messages: list) -> list:
+    """누적 요약이 있으면 프롬프트 앞에 SystemMessage 로 추가"""
+    summary = state.get("summary")
+    if not summary:
+        return messages
+    return [SystemMessage(content=f"이전 대화 요약:\n{summary}")] + messages
+
+
+async def memory_node(state: AgentState) -> AgentState:
+    messages = state["messages"]
+    turn_starts = [i for i, m in enumerate(messages) if isinstance(m, HumanMessage)]
+
+    # 이번 턴 질문을 제외한 이전 턴 수
+    if len(turn_starts) - 1 <= MEMORY_MAX_TURNS:
+        return {}
+
+    # 턴 단위로 자름 → tool_calls / ToolMessage 짝이 깨지지 않음
+    cut = turn_starts[-(MEMORY_KEEP_TURNS + 1)]
+    old = messages[:cut]
+
+    response = await call_llm(summary_llm, [
+        SystemMessage(content=SUMMARY_PROMPT.strip()),
+        HumanMessage(content=(
+            f"기존 요약:\n{state.get('summary') or '(없음)'}\n\n"
+            f"새 대화:\n{_render_turns(old)}"
+        )),
+    ])
+    print(f"🗜️ MEMORY COMPACTION — 메시지 {len(old)}개 → 요약 {len(response.content)}자")
+
+    return {
+        "summary": response.content,
+        "messages": [RemoveMessage(id=m.id) for m in old],
+    }
 
 
 # =========================
 # Nodes
 # =========================
+async def router_node(state: AgentState) -> AgentState:
+    # 키워드 규칙 / centroid 로 확실한 질문은 agent LLM 호출 없이 바로 처리
+    question = current_question(state["messages"])
+    route = await run_blocking(route_question, question)
+
+    update = {"route": route}
+    if route["target"] == "tools":
+        # ToolNode 가 실행할 수 있도록 tool_calls 를 가진 AIMessage 를 직접 생성
+        update["messages"] = [AIMessage(content="", tool_calls=route["tool_calls"])]
+    return update
+
+
+# =========================
+# Speculative retrieval
+#  - agent LLM 이 tool 사용 여부를 고민하는 동안 FAISS 검색 / 규정 문서 키워드 검색을
+#    미리 실행해 둔다 (검색 지연을 LLM 지연 뒤로 숨김)
+#  - 결과는 vector_fallback 에서 재사용되고, 쓰이지 않으면 다음 턴에 덮어써진다
+#  - agent 가 tool 을 호출하기로 하면 검색은 필요 없으므로 바로 취소
+# =========================
+SPECULATIVE_RETRIEVAL = os.getenv("SPECULATIVE_RETRIEVAL", "1") == "1"
+
+
+async def keyword_docs(question: str) -> list:
+    # 질문 문장 대신 검색어만 넘김 (같은 검색어의 질문은 tool 캐시도 공유)
+    terms = query_terms(question)
+    if not terms:
+        return []
+    _, artifact = await search_docs.coroutine(" ".join(terms))
+    return [
+        {"source": d["source"], "content": d["content"]}
+        for d in artifact.get("documents", [])
+    ]
+
+
 async def agent_node(state: AgentState) -> AgentState:
-    # Agent는 tool을 호출할지/말지 판단
-    response = await agent_llm.ainvoke(state["messages"])
-    return {"messages": [response]}
+    question = current_question(state["messages"])
+    prefetched = state.get("prefetched") or {}
+    # batch 엔드포인트처럼 호출 측이 검색 결과를 미리 넣어준 경우 다시 검색하지 않음
+    already_prefetched = prefetched.get("question") == question and prefetched.get("vector") is not None
+
+    if not SPECULATIVE_RETRIEVAL or already_prefetched:
+        # Agent는 tool을 호출할지/말지 판단
+        response = await call_llm(agent_llm, with_summary(state, state["messages"]))
+        return {"messages": [response]}
+
+    vector_task = asyncio.create_task(run_blocking(_vector_fallback_docs, question))
+    keyword_task = asyncio.create_task(keyword_docs(question))
+
+    try:
+        # Agent는 tool을 호출할지/말지 판단 (검색은 동시에 진행)
+        response = await call_llm(agent_llm, with_summary(state, state["messages"]))
+    except BaseException:
+        vector_task.cancel()
+        keyword_task.cancel()
+        raise
+
+    if response.tool_calls:
+        vector_task.cancel()
+        keyword_task.cancel()
+        return {"messages": [response]}
+
+    vector_res, keyword_res = await asyncio.gather(
+        vector_task, keyword_task, return_exceptions=True
+    )
+    prefetched = {
+        "question": question,
+        "vector": vector_res if isinstance(vector_res, list) else None,
+        "keyword": keyword_res if isinstance(keyword_res, list) else [],
+    }
+    return {"messages": [response], "prefetched": prefetched}
+
+
+def _vector_fallback_docs(question: str) -> list:
+    db = get_vector_store()
+    if not db:
+        return []
+
+    return [_fallback_doc(d) for d in db.similarity_search(question, k=3)]
+
+
+def _fallback_doc(d) -> dict:
+    return {
+        "source": d.metadata.get("source", "vector_store"),
+        "content": d.page_content[:800],
+    }
+
+
+async def batch_prefetch(questions: list[str]) -> tuple[list[dict], list]:
+    """
+    질문 여러 개의 vector / keyword 검색을 한 번에 수행.
+    반환: (질문별 prefetched state, 질문별 임베딩 벡터)
+    vector 검색은 질문 임베딩 요청 1회 + FAISS 검색 1회.
+    """
+    vectors, results = await abatch_similarity_search(questions, k=3)
+    if results is None:
+        results = [[] for _ in questions]
+    keywords = await asyncio.gather(*(keyword_docs(q) for q in questions))
+    prefetched = [
+        {
+            "question": q,
+            "vector": [_fallback_doc(d) for d in docs],
+            "keyword": kw,
+        }
+        for q, docs, kw in zip(questions, results, keywords)
+    ]
+    return prefetched, vectors
+
+
+async def vector_fallback_node(state: AgentState) -> AgentState:
+    # tool 결과에 근거가 없을 때 FAISS 에서 직접 검색 (LLM 호출 없음)
+    question = current_question(state["messages"])
+
+    prefetched = state.get("prefetched") or {}
+    if prefetched.get("question") == question and prefetched.get("vector") is not None:
+        # agent 와 동시에 미리 검색해 둔 결과 재사용
+        docs = prefetched["vector"] + [
+            d for d in prefetched.get("keyword", [])
+            if d not in prefetched["vector"]
+        ]
+    else:
+        docs = await run_blocking(_vector_fallback_docs, question)
+
+    return {"fallback_sources": docs}
+
+
+def fallback_message(vector_docs: list) -> HumanMessage:
+    fallback_context = "\n\n".join(
+        f"[{d['source']}]\n{d['content']}"
+        for d in vector_docs
+    )
+    return HumanMessage(
+        content=(
+            "다음은 사내 문서(Vector Store)에서 검색된 참고 자료입니다.\n\n"
+            f"{fallback_context}\n\n"
+            "이 정보를 참고하여 최종 답변을 작성하세요."
+        )
+    )
+
+
+def split_current_turn(messages: list) -> tuple[list, list]:
+    """(이전 대화, 마지막 HumanMessage 부터의 이번 턴)"""
+    for i in range(len(messages) - 1, -1, -1):
+        if isinstance(messages[i], HumanMessage):
+            return messages[:i], messages[i:]
+    return messages, []
 
 
 async def summarize_node(state: AgentState) -> AgentState:
     """
     ⭐ 타임아웃 방지 핵심:
-    - messages 전체를 그대로 재주입하지 말고 "최근 N개"만 사용
-    - tool 결과(검색 문서)는 이미 messages에 포함될 수 있으니,
-      너무 길면 요약 프롬프트로 압축 유도
+    - messages 전체를 그대로 재주입하지 않고 token 예산(CONTEXT_TOKEN_BUDGET) 안에서만 채움
+    - tool 결과(검색 문서)가 길면 질문과 관련 있는 줄 위주로 잘라서 포함
     """
     messages = state["messages"]
+    history, turn = split_current_turn(messages)
 
-    # 최근 대화만 사용 (컨텍스트 폭증 방지)
-    recent = messages[-12:]  # 필요시 8~16 사이로 조절
-
-    # 사용자 질문(첫 HumanMessage) 추출
-    user_question = ""
-    for m in messages:
-        if isinstance(m, HumanMessage):
-            user_question = m.content
-            break
+    # 사용자 질문(이번 턴 HumanMessage)
+    user_question = current_question(messages)
 
-    system_msg = SystemMessage(content=SYSTEM_PROMPT.strip())
+    system_prompt = SYSTEM_PROMPT.strip()
+    if state.get("summary"):
+        # 누적 요약은 고정 항목(system prompt)에 포함 → token 예산에서 우선 확보
+        system_prompt += f"\n\n이전 대화 요약:\n{state['summary']}"
+    system_msg = SystemMessage(content=system_prompt)
 
     # 최종 정리 지시
     human_msg = HumanMessage(
@@ -107,9 +436,23 @@ async def summarize_node(state: AgentState) -> AgentState:
         )
     )
 
+    # vector fallback 결과는 히스토리에 남기지 않고 이번 프롬프트에만 포함
+    fallback = []
+    if state.get("fallback_sources"):
+        fallback = [fallback_message(state["fallback_sources"])]
+
+    prompt = pack_context(
+        system_msg,
+        human_msg,
+        user_question,
+        history=history,
+        turn=turn,
+        evidence=fallback,
+    )
+
     # summarize는 tool 바인딩 없이도 되지만, 동일 모델 재사용
     # (num_predict 제한 덕에 길어지지 않음)
-    response = await agent_llm.ainvoke([system_msg] + recent + [human_msg])
+    response = await call_llm(agent_llm, prompt)
     return {"messages": [response]}
 
 
@@ -118,21 +461,45 @@ async def summarize_node(state: AgentState) -> AgentState:
 # =========================
 builder = StateGraph(AgentState)
 
+builder.add_node("memory", memory_node)
+builder.add_node("router", router_node)
 builder.add_node("agent", agent_node)
-builder.add_node("tools", tool_node)
+builder.add_node("tools", tools_node)
+builder.add_node("vector_fallback", vector_fallback_node)
 builder.add_node("summarize", summarize_node)
 
-builder.add_edge(START, "agent")
+builder.add_edge(START, "memory")
+builder.add_edge("memory", "router")
+builder.add_conditional_edges(
+    "router",
+    route_after_router,
+    {
+        "agent": "agent",
+        "tools": "tools",
+        "summarize": "summarize",
+    },
+)
 builder.add_conditional_edges(
     "agent",
     route_after_agent,
     {
         "tools": "tools",
+        "vector_fallback": "vector_fallback",
+        "summarize": "summarize",
+    },
+)
+builder.add_conditional_edges(
+    "tools",
+    route_after_tools,
+    {
+        "vector_fallback": "vector_fallback",
         "summarize": "summarize",
     },
 )
-builder.add_edge("tools", "agent")
+builder.add_edge("vector_fallback", "summarize")
 builder.add_edge("summarize", END)
 
+# 기본은 메모리 checkpointer.
+# FastAPI 앱 시작 시 SQLite 기반 BoundedSqliteSaver(checkpointer.py) 로 교체된다.
 memory = MemorySaver()
 graph = builder.compile(checkpointer=memory)
@@ -0,0 +1,333 @@
+import json
+import os
+import sqlite3
+import uuid
+from datetime import date, datetime, time as dtime
+from pathlib import Path
+
+
+# =========================
+# HR 표 저장소 (SQLite)
+#  - 업로드된 엑셀 sheet / CSV 를 sheet 하나당 테이블 하나로 적재
+#  - hr_tables: (source, sheet) → 실제 테이블 이름, 컬럼/타입, 행 수
+#  - 집계(건수, group by)는 벡터 검색 없이 전체 데이터에 대해 수행
+# =========================
+STATE_DIR = Path(os.getenv("APP_STATE_DIR", Path(__file__).resolve().parent))
+HR_DB_FILE = STATE_DIR / "hr_tables.db"
+
+INSERT_BATCH_ROWS = 1000
+MAX_INDEXED_COLUMNS = 20
+MAX_GROUPS = 30
+
+
+def get_conn():
+    conn = sqlite3.connect(HR_DB_FILE, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS hr_tables (
+        table_name TEXT PRIMARY KEY,
+        source TEXT,
+        sheet TEXT,
+        columns TEXT,
+        row_count INTEGER,
+        loaded_at TEXT
+    )
+    """)
+    return conn
+
+
+def _q(name: str) -> str:
+    """SQLite 식별자 quote"""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _to_sql_value(value):
+    if value is None:
+        return None
+    if isinstance(value, float) and value != value:  # NaN
+        return None
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (datetime, date, dtime)):
+        return value.isoformat()
+    if isinstance(value, (int, float)):
+        return value
+    if hasattr(value, "item"):  # numpy scalar
+        return _to_sql_value(value.item())
+    text = str(value).strip()
+    return text or None
+
+
+def _type_name(types: set) -> str:
+    types = types - {type(None)}
+    if not types:
+        return "NULL"
+    if types <= {int}:
+        return "INTEGER"
+    if types <= {int, float}:
+        return "REAL"
+    return "TEXT"
+
+
+# =========================
+# 적재 (인제스트 워커에서 행 단위로 호출)
+# =========================
+class HrTableLoader:
+    """
+    iter_row_documents(on_row=...) 콜백으로 받은 행을 sheet 별 staging 테이블에 적재하고,
+    finish() 시점에 적재 중 본 값의 타입으로 컬럼 타입(affinity)을 선언한 테이블로 옮긴 뒤
+    같은 (source, sheet) 의 이전 테이블과 교체한다.
+    """
+
+    def __init__(self, source: str):
+        self.source = source
+        self.conn = get_conn()
+        self.sheets: dict = {}
+
+    def add_row(self, sheet: str, header: list[str], values):
+        state = self.sheets.get(sheet)
+        if state is None:
+            state = self._create_sheet_table(sheet, header)
+
+        row = [_to_sql_value(v) for v in list(values)[: len(state["columns"])]]
+        row += [None] * (len(state["columns"]) - len(row))
+        if all(v is None for v in row):
+            return
+
+        for types, v in zip(state["types"], row):
+            types.add(type(v))
+
+        state["buffer"].append(row)
+        state["row_count"] += 1
+        if len(state["buffer"]) >= INSERT_BATCH_ROWS:
+            self._flush(state)
+
+    def _create_sheet_table(self, sheet: str, header: list[str]) -> dict:
+        # 중복/빈 컬럼명 정리
+        columns = []
+        for i, name in enumerate(header):
+            name = str(name).strip() or f"Unnamed: {i}"
+            while name in columns:
+                name = f"{name}_{i}"
+            columns.append(name)
+
+        # 컬럼 타입은 모든 행을 본 뒤에야 정해지므로 우선 타입 없는 staging 테이블에 적재
+        table_name = f"hr_{uuid.uuid4().hex[:12]}"
+        staging = f"{table_name}_staging"
+        self.conn.execute(
+            f"CREATE TABLE {_q(staging)} ({', '.join(_q(c) for c in columns)})"
+        )
+        state = {
+            "table_name": table_name,
+            "staging": staging,
+            "columns": columns,
+            "types": [set() for _ in columns],
+            "buffer": [],
+            "row_count": 0,
+        }
+        self.sheets[sheet] = state
+        return state
+
+    def _flush(self, state: dict):
+        if not state["buffer"]:
+            return
+        marks = ",".join("?" * len(state["columns"]))
+        self.conn.executemany(
+            f"INSERT INTO {_q(state['staging'])} VALUES ({marks})",
+            state["buffer"],
+        )
+        state["buffer"].clear()
+
+    def finish(self):
+        try:
+            for state in self.sheets.values():
+                self._flush(state)
+                self._create_typed_table(state)
+                for i, col in enumerate(state["columns"][:MAX_INDEXED_COLUMNS]):
+                    idx_name = f"idx_{state['table_name']}_{i}"
+                    self.conn.execute(
+                        f"CREATE INDEX {_q(idx_name)} ON {_q(state['table_name'])}({_q(col)})"
+                    )
+
+            # 같은 source 의 이전 테이블 교체
+            old = self.conn.execute(
+                "SELECT table_name FROM hr_tables WHERE source = ?", (self.source,)
+            ).fetchall()
+            for (name,) in old:
+                self.conn.execute(f"DROP TABLE IF EXISTS {_q(name)}")
+            self.conn.execute("DELETE FROM hr_tables WHERE source = ?", (self.source,))
+
+            now = datetime.now().isoformat(timespec="seconds")
+            for sheet, state in self.sheets.items():
+                columns = [
+                    {"name": c, "type": _type_name(t)}
+                    for c, t in zip(state["columns"], state["types"])
+                ]
+                self.conn.execute(
+                    "INSERT INTO hr_tables(table_name, source, sheet, columns, row_count, loaded_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        state["table_name"],
+                        self.source,
+                        sheet,
+                        json.dumps(columns, ensure_ascii=False),
+                        state["row_count"],
+                        now,
+                    ),
+                )
+            self.conn.commit()
+        finally:
+            self.conn.close()
+
+    def _create_typed_table(self, state: dict):
+        """staging → 컬럼 타입을 선언한 최종 테이블 (필터가 CAST 없이 인덱스를 타도록)"""
+        column_defs = []
+        for col, types in zip(state["columns"], state["types"]):
+            type_name = _type_name(types)
+            column_defs.append(_q(col) if type_name == "NULL" else f"{_q(col)} {type_name}")
+
+        self.conn.execute(f"CREATE TABLE {_q(state['table_name'])} ({', '.join(column_defs)})")
+        self.conn.execute(
+            f"INSERT INTO {_q(state['table_name'])} SELECT * FROM {_q(state['staging'])}"
+        )
+        self.conn.execute(f"DROP TABLE {_q(state['staging'])}")
+
+    def abort(self):
+        try:
+            self.conn.rollback()
+            for state in self.sheets.values():
+                self.conn.execute(f"DROP TABLE IF EXISTS {_q(state['staging'])}")
+                self.conn.execute(f"DROP TABLE IF EXISTS {_q(state['table_name'])}")
+            self.conn.commit()
+        finally:
+            self.conn.close()
+
+
+# =========================
+# 조회 / 집계
+# =========================
+def list_tables() -> list[dict]:
+    conn = get_conn()
+    rows = conn.execute("""
+        SELECT table_name, source, sheet, columns, row_count, loaded_at
+        FROM hr_tables
+        ORDER BY loaded_at DESC
+    """).fetchall()
+    conn.close()
+
+    return [
+        {
+            "table_name": r[0],
+            "source": r[1],
+            "sheet": r[2],
+            "columns": json.loads(r[3]),
+            "row_count": r[4],
+            "loaded_at": r[5],
+        }
+        for r in rows
+    ]
+
+
+def tables_version():
+    """HR 표 변경 감지용 (테이블 수, 마지막 적재 시각)"""
+    conn = get_conn()
+    row = conn.execute("SELECT COUNT(*), MAX(loaded_at) FROM hr_tables").fetchone()
+    conn.close()
+    return tuple(row)
+
+
+def parse_filters(filters: str) -> list[tuple[str, str]]:
+    """'role=Backend, dept=개발1팀' → [('role', 'Backend'), ('dept', '개발1팀')]"""
+    pairs = []
+    for part in (filters or "").split(","):
+        if "=" not in part:
+            continue
+        col, value = part.split("=", 1)
+        if col.strip():
+            pairs.append((col.strip(), value.strip()))
+    return pairs
+
+
+def _pick_table(tables: list[dict], table: str, needed: list[str]):
+    """table(source 또는 sheet 이름 일부) 과 필요한 컬럼으로 대상 테이블 선택"""
+    for t in tables:
+        names = {c["name"].lower() for c in t["columns"]}
+        if table and table.lower() not in f"{t['source']} {t['sheet']}".lower():
+            continue
+        if all(n.lower() in names for n in needed):
+            return t
+    return None
+
+
+def _resolve_column(t: dict, name: str) -> dict:
+    for c in t["columns"]:
+        if c["name"].lower() == name.lower():
+            return c
+    raise KeyError(name)
+
+
+def _typed_param(column: dict, value: str):
+    """필터 값(문자열)을 컬럼 타입에 맞게 변환 → 컬럼을 그대로 비교해 인덱스 사용"""
+    if column["type"] in ("INTEGER", "REAL"):
+        for convert in (int, float):
+            try:
+                return convert(value)
+            except ValueError:
+                continue
+    return value
+
+
+def aggregate(group_by: str = "", filters: str = "", table: str = "") -> dict:
+    """
+    전체 행에 대해 필터 후 건수 / group by 건수를 계산.
+    반환: {"table": ..., "total": n, "groups": [(값, 건수), ...]} 또는 {"error": ...}
+    """
+    tables = list_tables()
+    if not tables:
+        return {"error": "적재된 HR 표 데이터가 없습니다. 엑셀 파일을 먼저 업로드해 주세요."}
+
+    filter_pairs = parse_filters(filters)
+    needed = [c for c, _ in filter_pairs] + ([group_by] if group_by else [])
+
+    t = _pick_table(tables, table, needed)
+    if t is None:
+        available = "; ".join(
+            f"{x['source']}/{x['sheet']}: " + ", ".join(c["name"] for c in x["columns"])
+            for x in tables[:5]
+        )
+        return {"error": f"요청한 컬럼을 가진 표를 찾지 못했습니다. 사용 가능한 표/컬럼: {available}"}
+
+    where = []
+    params = []
+    for col, value in filter_pairs:
+        column = _resolve_column(t, col)
+        where.append(f"{_q(column['name'])} = ?")
+        params.append(_typed_param(column, value))
+    where_sql = f" WHERE {' AND '.join(where)}" if where else ""
+
+    conn = get_conn()
+    try:
+        total = conn.execute(
+            f"SELECT COUNT(*) FROM {_q(t['table_name'])}{where_sql}", params
+        ).fetchone()[0]
+
+        groups = []
+        if group_by:
+            col = _q(_resolve_column(t, group_by)["name"])
+            groups = conn.execute(
+                f"SELECT {col}, COUNT(*) AS n FROM {_q(t['table_name'])}{where_sql} "
+                f"GROUP BY {col} ORDER BY n DESC LIMIT {MAX_GROUPS}",
+                params,
+            ).fetchall()
+    finally:
+        conn.close()
+
+    return {
+        "table": {"source": t["source"], "sheet": t["sheet"], "row_count": t["row_count"]},
+        "columns": [c["name"] for c in t["columns"]],
+        "group_by": group_by,
+        "filters": filter_pairs,
+        "total": total,
+        "groups": [(g if g is not None else "(빈 값)", n) for g, n in groups],
+    }
+
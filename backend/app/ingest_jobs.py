@@ -0,0 +1,123 @@
+import os
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from .hr_db import HrTableLoader
+from .text_extract import iter_row_documents
+from .vector_store import build_vector_store_from_documents
+
+
+# =========================
+# 업로드 인제스트 작업 큐
+#  - upload-report 는 파일 저장 후 job 만 등록하고 바로 반환
+#  - 파싱/임베딩은 INGEST_WORKERS 개의 워커 스레드가 처리
+#  - /jobs/{id} 에서 stage, 진행률, 단계별 소요시간 조회
+# =========================
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "2"))
+JOB_HISTORY = int(os.getenv("INGEST_JOB_HISTORY", "200"))
+
+_executor = ThreadPoolExecutor(max_workers=INGEST_WORKERS, thread_name_prefix="ingest")
+_jobs_lock = threading.Lock()
+_jobs: "OrderedDict[str, dict]" = OrderedDict()
+
+
+def _update(job_id: str, **fields):
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        if job is not None:
+            job.update(fields)
+
+
+def _start_stage(job_id: str, stage: str):
+    now = time.time()
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        if job is None:
+            return
+        prev = job["stage"]
+        if job.get("_stage_started"):
+            job["timings"][prev] = round(now - job["_stage_started"], 3)
+        job["stage"] = stage
+        job["_stage_started"] = now
+
+
+def _run_job(job_id: str, file_path: Path, filename: str):
+    _update(job_id, status="running", started_at=time.time())
+    try:
+        # 파싱과 임베딩이 window 단위로 겹쳐서 진행되므로 하나의 stage 로 기록
+        _start_stage(job_id, "parsing+embedding")
+        rows = {"n": 0}
+        # 같은 pass 에서 원본 행을 HR 표(SQLite)에도 적재 → 집계 tool 용
+        table_loader = HrTableLoader(filename)
+
+        def counted_rows():
+            for doc in iter_row_documents(file_path, filename, on_row=table_loader.add_row):
+                rows["n"] += 1
+                if rows["n"] % 100 == 0:
+                    _update(job_id, rows_parsed=rows["n"])
+                yield doc
+            _update(job_id, rows_parsed=rows["n"])
+
+        def on_progress(done: int, total: int):
+            _update(job_id, chunks_embedded=done, chunks_total=total)
+
+        added = build_vector_store_from_documents(
+            counted_rows(), {filename}, on_progress=on_progress
+        )
+        if added is None:
+            table_loader.abort()
+            raise RuntimeError("vector index build failed")
+        table_loader.finish()
+
+        _start_stage(job_id, "done")
+        _update(job_id, status="done", finished_at=time.time())
+
+    except Exception as e:
+        traceback.print_exc()
+        _start_stage(job_id, "failed")
+        _update(job_id, status="failed", error=str(e), finished_at=time.time())
+
+
+def submit_ingest_job(file_path: Path, filename: str) -> str:
+    job_id = uuid.uuid4().hex
+    now = time.time()
+
+    with _jobs_lock:
+        _jobs[job_id] = {
+            "job_id": job_id,
+            "filename": filename,
+            "status": "queued",
+            "stage": "queued",
+            "rows_parsed": 0,
+            "chunks_total": 0,
+            "chunks_embedded": 0,
+            "timings": {},
+            "error": None,
+            "created_at": now,
+            "started_at": None,
+            "finished_at": None,
+            "_stage_started": now,
+        }
+        # 오래된 완료 job 은 정리 (메모리 상한)
+        while len(_jobs) > JOB_HISTORY:
+            oldest_id, oldest = next(iter(_jobs.items()))
+            if oldest["status"] in ("queued", "running"):
+                break
+            _jobs.pop(oldest_id)
+
+    _executor.submit(_run_job, job_id, file_path, filename)
+    return job_id
+
+
+def get_job(job_id: str):
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        if job is None:
+            return None
+        return {k: (dict(v) if isinstance(v, dict) else v)
+                for k, v in job.items() if not k.startswith("_")}
@@ -0,0 +1,137 @@
+import asyncio
+import heapq
+import itertools
+import math
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+
+
+# =========================
+# LLM 호출 admission control
+#  - 로컬 Ollama 하나를 모든 요청이 공유하므로 동시에 생성하는 LLM 호출 수를
+#    LLM_MAX_IN_FLIGHT 개로 제한하고 나머지는 우선순위 큐에서 대기
+#  - 같은 우선순위 안에서는 FIFO (숫자가 작을수록 먼저)
+#  - 대기열이 LLM_MAX_QUEUE 개 이상이면 즉시 거절 → 엔드포인트가 HTTP 429 + Retry-After
+#  - 모두가 같이 느려져 타임아웃 나는 대신 일부 요청은 빠르게 답을 받음
+# =========================
+LLM_MAX_IN_FLIGHT = int(os.getenv("LLM_MAX_IN_FLIGHT", "2"))
+LLM_MAX_QUEUE = int(os.getenv("LLM_MAX_QUEUE", "16"))
+# 처리 시간 측정값이 없을 때 Retry-After 계산에 쓰는 LLM 호출 1회 예상 시간(초)
+LLM_DEFAULT_SERVICE_SECONDS = float(os.getenv("LLM_DEFAULT_SERVICE_SECONDS", "10"))
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 1
+
+# 요청 단위 우선순위 (엔드포인트에서 설정 → graph 노드의 LLM 호출까지 전파)
+llm_priority: ContextVar[int] = ContextVar("llm_priority", default=PRIORITY_INTERACTIVE)
+
+
+class LlmOverloaded(Exception):
+    def __init__(self, retry_after: int):
+        super().__init__(f"LLM queue is full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+def _percentile(values, q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+class LlmScheduler:
+    def __init__(self, max_in_flight: int = LLM_MAX_IN_FLIGHT, max_queue: int = LLM_MAX_QUEUE):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self._in_flight = 0
+        self._waiters: list = []          # heap of [priority, seq, future]
+        self._seq = itertools.count()
+        self._wait_times = deque(maxlen=500)
+        self._service_times = deque(maxlen=200)
+        self.stats = {"admitted": 0, "rejected": 0, "completed": 0}
+
+    def retry_after(self) -> int:
+        if self._service_times:
+            avg = sum(self._service_times) / len(self._service_times)
+        else:
+            avg = LLM_DEFAULT_SERVICE_SECONDS
+        return max(1, math.ceil((len(self._waiters) + 1) * avg / self.max_in_flight))
+
+    def check_admission(self):
+        """대기열이 가득 찼으면 LlmOverloaded (엔드포인트 진입 시 빠른 거절용)"""
+        if len(self._waiters) >= self.max_queue:
+            self.stats["rejected"] += 1
+            raise LlmOverloaded(self.retry_after())
+
+    @asynccontextmanager
+    async def slot(self, priority: int = None):
+        if priority is None:
+            priority = llm_priority.get()
+        enqueued = time.perf_counter()
+
+        if self._in_flight < self.max_in_flight and not self._waiters:
+            self._in_flight += 1
+        else:
+            self.check_admission()
+            fut = asyncio.get_running_loop().create_future()
+            entry = [priority, next(self._seq), fut]
+            heapq.heappush(self._waiters, entry)
+            try:
+                await fut
+            except asyncio.CancelledError:
+                if fut.done() and not fut.cancelled():
+                    # slot 을 넘겨받은 직후 취소됨 → 다음 대기자에게 양보
+                    self._release()
+                elif entry in self._waiters:
+                    self._waiters.remove(entry)
+                    heapq.heapify(self._waiters)
+                raise
+
+        self._wait_times.append(time.perf_counter() - enqueued)
+        self.stats["admitted"] += 1
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._service_times.append(time.perf_counter() - started)
+            self.stats["completed"] += 1
+            self._release()
+
+    def _release(self):
+        # 대기자가 있으면 in_flight 를 줄이지 않고 slot 을 그대로 넘김
+        while self._waiters:
+            _, _, fut = heapq.heappop(self._waiters)
+            if not fut.done():
+                fut.set_result(None)
+                return
+        self._in_flight -= 1
+
+    def snapshot(self) -> dict:
+        return {
+            **self.stats,
+            "max_in_flight": self.max_in_flight,
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+            "queued": len(self._waiters),
+            "queue_wait_p50": round(_percentile(self._wait_times, 0.50), 3),
+            "queue_wait_p95": round(_percentile(self._wait_times, 0.95), 3),
+            "service_time_avg": round(
+                sum(self._service_times) / len(self._service_times), 3
+            ) if self._service_times else None,
+        }
+
+
+llm_scheduler = LlmScheduler()
+
+
+async def call_llm(llm, messages: list):
+    """스케줄러 slot 을 얻은 뒤 LLM 호출"""
+    async with llm_scheduler.slot():
+        return await llm.ainvoke(messages)
+
+
+def llm_stats() -> dict:
+    return llm_scheduler.snapshot()
@@ -1,14 +1,20 @@
 from __future__ import annotations
 
+import asyncio
 import json
+import os
 import shutil
+import time
+import uuid
+from contextlib import asynccontextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 
 from dotenv import load_dotenv
-from fastapi import FastAPI, UploadFile, File, HTTPException, Query
+from fastapi import FastAPI, UploadFile, File, HTTPException, Query, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 
 from langchain_core.messages import (
@@ -17,10 +23,28 @@ from langchain_core.messages import (
     ToolMessage,
 )
 
-from .graph import graph
-from .project_config import PROJECT_NAME
-from .vector_store import build_vector_store, load_vector_store
-from .text_extract import extract_text
+from .graph import graph, current_turn_messages, current_question, batch_prefetch
+from .project_config import PROJECT_NAME, tool_cache_stats
+from .vector_store import asimilarity_search, vector_cache_stats
+from .ingest_jobs import submit_ingest_job, get_job
+from .hr_db import aggregate, list_tables
+from .embedding_cache import cache_stats
+from .query_router import router_stats
+from . import answer_cache
+from .llm_scheduler import (
+    LlmOverloaded,
+    llm_scheduler,
+    llm_stats,
+    llm_priority,
+    PRIORITY_BATCH,
+)
+from .blocking import run_blocking, monitor_loop_lag, loop_lag_stats, blocking_pool_stats
+from .checkpointer import (
+    open_checkpointer,
+    close_checkpointer,
+    run_checkpoint_maintenance,
+    checkpoint_stats,
+)
 from .pmo_db import (
     summarize_project_status,
     save_report_to_db,
@@ -34,7 +58,20 @@ load_dotenv()
 # ==========================================================
 # FastAPI App
 # ==========================================================
-app = FastAPI(title=f"AI Agent - {PROJECT_NAME}")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 대화 state 를 SQLite checkpointer 로 교체 (재시작 후에도 유지, 메모리 상한)
+    graph.checkpointer = await open_checkpointer()
+    maintenance = asyncio.create_task(run_checkpoint_maintenance())
+    # 이벤트 루프 지연 측정 (블로킹 호출 회귀 감지)
+    lag_monitor = asyncio.create_task(monitor_loop_lag())
+    yield
+    lag_monitor.cancel()
+    maintenance.cancel()
+    await close_checkpointer()
+
+
+app = FastAPI(title=f"AI Agent - {PROJECT_NAME}", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -44,12 +81,24 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# LLM 대기열 초과 → 429 + Retry-After (graph 실행 중 거절된 경우 포함)
+@app.exception_handler(LlmOverloaded)
+async def llm_overloaded_handler(request, exc: LlmOverloaded):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": "LLM 요청이 많아 대기열이 가득 찼습니다.", "retry_after": exc.retry_after},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
 # ==========================================================
 # Models
 # ==========================================================
 class ChatRequest(BaseModel):
     question: str
     thread_id: str
+    # 응답 제한 시간(초). 없으면 X-Deadline-Seconds 헤더 → GRAPH_DEADLINE_SECONDS
+    deadline_seconds: Optional[float] = None
 
 
 class ChatResponse(BaseModel):
@@ -57,6 +106,9 @@ class ChatResponse(BaseModel):
     answer: str
     sources: list = []
     graph_flow: list = []
+    cache_hit: bool = False
+    # 제한 시간 초과로 중간까지의 결과만 담은 응답
+    partial: bool = False
 
 
 # ==========================================================
@@ -70,18 +122,211 @@ async def talent():
     }
 
 
+# ==========================================================
+# Graph 결과 후처리 (invoke / stream 공통)
+# ==========================================================
+def _final_answer(messages: list) -> str:
+    for m in reversed(messages):
+        if isinstance(m, AIMessage) and m.content:
+            return m.content
+    return ""
+
+
+def _collect_sources(turn_messages: list) -> list:
+    """ToolMessage.artifact(구조화 결과) 기반 source 수집 (중복 제거)"""
+    current_turn_sources: list = []
+
+    for m in turn_messages:
+        if not isinstance(m, ToolMessage):
+            continue
+
+        artifact = getattr(m, "artifact", None)
+        if isinstance(artifact, dict):
+            for item in artifact.get("documents", []):
+                current_turn_sources.append({
+                    "source": item.get("source"),
+                    "content": item.get("content"),
+                    "score": item.get("score"),
+                })
+
+    # 중복 제거
+    return list({
+        (s["source"], s["content"]): s
+        for s in current_turn_sources
+        if s.get("source") and s.get("content")
+    }.values())
+
+
+def _build_graph_flow(
+    tool_attempted: bool,
+    vector_fallback_used: bool,
+    fast_routed: bool = False,
+    tool_timings: list = (),
+) -> list:
+    graph_flow = ["User Question"]
+
+    if fast_routed:
+        graph_flow.append("Fast Router")
+
+    if tool_attempted:
+        graph_flow.append("Agent → Tools")
+        # 동시에 실행된 tool 별 소요 시간
+        graph_flow.extend(f"{t['tool']} {t['ms']}ms" for t in tool_timings)
+    else:
+        graph_flow.append("Agent Reasoning")
+
+    if vector_fallback_used:
+        graph_flow.append("Vector Fallback")
+
+    graph_flow.append("Summarize")
+    return graph_flow
+
+
+def _turn_response(thread_id: str, values: dict) -> dict:
+    """그래프 최종 state → 응답 (answer / sources / graph_flow)"""
+    messages = values["messages"]
+    turn_messages = current_turn_messages(messages)
+
+    # tool artifact 근거가 없으면 그래프 안의 vector_fallback 결과 사용
+    fallback_sources = values.get("fallback_sources") or []
+    sources = _collect_sources(turn_messages) or fallback_sources
+
+    tool_attempted = any(
+        isinstance(m, AIMessage) and m.tool_calls
+        for m in turn_messages
+    )
+
+    return {
+        "thread_id": thread_id,
+        "cache_hit": False,
+        "answer": _final_answer(messages),
+        "sources": sources,
+        "graph_flow": _build_graph_flow(
+            tool_attempted,
+            bool(fallback_sources),
+            (values.get("route") or {}).get("method") in ("rule", "centroid"),
+            values.get("tool_timings") or [],
+        ),
+    }
+
+
+async def _answer_cache_lookup(question: str, config: dict, vector=None):
+    """
+    (cached entry | None, 질문 벡터) — 임베딩 실패 시 캐시 없이 진행.
+    답변 캐시는 질문만으로 매칭하므로 이전 대화가 있는 thread 에서는 조회/저장하지 않음
+    (벡터가 None 이면 store 도 건너뜀) → "더 자세히 알려줘" 같은 후속 질문 오매칭 방지
+    """
+    state = await graph.aget_state(config)
+    if state.values.get("messages"):
+        return None, None
+
+    try:
+        return await answer_cache.alookup(question, vector)
+    except Exception as e:
+        print("⚠️ ANSWER CACHE LOOKUP ERROR =>", e)
+        return None, None
+
+
+async def _cached_turn_response(thread_id: str, question: str, cached: dict, config: dict) -> dict:
+    # 캐시 답변도 thread 대화 기록에 남겨 다음 턴 문맥이 이어지도록 함
+    await graph.aupdate_state(
+        config,
+        {"messages": [HumanMessage(content=question), AIMessage(content=cached["answer"])]},
+        as_node="summarize",
+    )
+    return {
+        "thread_id": thread_id,
+        "cache_hit": True,
+        "answer": cached["answer"],
+        "sources": cached["sources"],
+        "graph_flow": ["User Question", "Answer Cache"],
+    }
+
+
+# ==========================================================
+# 제한 시간 / 클라이언트 연결 끊김 처리
+#  - graph 를 task 로 실행하고 (완료 | 제한 시간 | 연결 끊김) 중 먼저 오는 쪽을 기다림
+#  - 제한 시간/연결 끊김이면 task 를 취소 → 진행 중인 Ollama 요청이 닫히고 대기 중인
+#    LLM slot 도 반환됨 (이미 blocking pool 에서 실행 중인 조회는 끝까지 실행된 뒤 버려짐)
+#  - 그때까지 완료된 state(tool 결과 / 검색 결과)와 생성된 토큰으로 부분 답변 구성
+# ==========================================================
+GRAPH_DEADLINE_SECONDS = float(os.getenv("GRAPH_DEADLINE_SECONDS", "400"))
+DISCONNECT_POLL_INTERVAL = 0.5
+
+
+def _deadline_for(req: ChatRequest, header_value: Optional[str]) -> float:
+    deadline = req.deadline_seconds
+    if deadline is None and header_value:
+        try:
+            deadline = float(header_value)
+        except ValueError:
+            deadline = None
+    if deadline is None or deadline <= 0:
+        return GRAPH_DEADLINE_SECONDS
+    return min(deadline, GRAPH_DEADLINE_SECONDS)
+
+
+async def _wait_for_disconnect(request: Request):
+    while not await request.is_disconnected():
+        await asyncio.sleep(DISCONNECT_POLL_INTERVAL)
+
+
+async def _run_graph_tracked(inputs: dict, config: dict, progress: dict) -> dict:
+    """ainvoke 대신 astream 으로 실행하면서 최신 state 와 summarize 토큰을 progress 에 기록"""
+    async for mode, chunk in graph.astream(
+        inputs, config=config, stream_mode=["values", "messages"]
+    ):
+        if mode == "values":
+            progress["values"] = chunk
+        elif mode == "messages":
+            message, metadata = chunk
+            if metadata.get("langgraph_node") == "summarize" and message.content:
+                progress["tokens"].append(message.content)
+    return progress["values"]
+
+
+def _partial_turn_response(thread_id: str, question: str, progress: dict) -> dict:
+    values = progress.get("values") or {"messages": []}
+    response = _turn_response(thread_id, values)
+
+    sources = response["sources"]
+    prefetched = values.get("prefetched") or {}
+    if not sources and prefetched.get("question") == question:
+        sources = (prefetched.get("vector") or []) + (prefetched.get("keyword") or [])
+
+    answer = "".join(progress["tokens"]).strip()
+    if answer:
+        answer += "\n\n⏱ 제한 시간이 지나 답변이 중간에 종료되었습니다."
+    elif sources:
+        answer = "⏱ 제한 시간 내에 답변을 완성하지 못했습니다. 지금까지 조회된 근거는 다음과 같습니다.\n\n"
+        answer += "\n".join(
+            f"- [{s['source']}] {str(s['content'])[:200]}" for s in sources[:5]
+        )
+    else:
+        answer = "⏱ 제한 시간 내에 답변을 완성하지 못했습니다. 잠시 후 다시 시도해 주세요."
+
+    response.update(
+        answer=answer,
+        sources=sources,
+        partial=True,
+        graph_flow=[step for step in response["graph_flow"] if step != "Summarize"] + ["Partial Answer"],
+    )
+    return response
+
+
 # ==========================================================
 # Graph Invoke (⭐ 핵심 엔드포인트)
 # ==========================================================
 @app.post("/graph/invoke", response_model=ChatResponse)
-async def graph_invoke(req: ChatRequest):
+async def graph_invoke(
+    req: ChatRequest,
+    request: Request,
+    x_deadline_seconds: Optional[str] = Header(None),
+):
 
     # -------------------------------
     # 0️⃣ 초기화
     # -------------------------------
-    sources: list = []
-    current_turn_sources: list = []
-
     config = {
         "configurable": {
             "thread_id": req.thread_id
@@ -89,161 +334,313 @@ async def graph_invoke(req: ChatRequest):
     }
 
     # -------------------------------
-    # 1️⃣ 최초 사용자 메시지
+    # 0️⃣-1 의미 기반 답변 캐시
     # -------------------------------
-    messages = [HumanMessage(content=req.question)]
+    cached, question_vector = await _answer_cache_lookup(req.question, config)
+    if cached:
+        print("answer cache hit::::", cached["question"], cached["similarity"])
+        return await _cached_turn_response(req.thread_id, req.question, cached, config)
+
+    # LLM 대기열이 가득 찼으면 graph 실행 전에 바로 거절
+    llm_scheduler.check_admission()
 
     # -------------------------------
-    # 2️⃣ LangGraph 실행
+    # 1️⃣ 최초 사용자 메시지 (fallback 결과는 턴마다 초기화)
     # -------------------------------
-    result_state = await graph.ainvoke(
-        {"messages": messages},
-        config=config,
-    )
-
-    messages = result_state["messages"]
+    inputs = {
+        "messages": [HumanMessage(content=req.question)],
+        "fallback_sources": [],
+        "tool_timings": [],
+        "prefetched": {},
+    }
 
     # -------------------------------
-    # 3️⃣ 최종 AI 답변 추출
+    # 2️⃣ LangGraph 실행
+    #  - agent → (tools) → (vector_fallback) → summarize 를 한 번에 수행
+    #  - 제한 시간 / 클라이언트 연결 끊김 시 취소
     # -------------------------------
-    answer = ""
-    for m in reversed(messages):
-        if isinstance(m, AIMessage) and m.content:
-            answer = m.content
-            break
+    deadline = _deadline_for(req, x_deadline_seconds)
+    progress = {"values": None, "tokens": []}
+    run = asyncio.create_task(_run_graph_tracked(inputs, config, progress))
+    disconnect = asyncio.create_task(_wait_for_disconnect(request))
+
+    try:
+        await asyncio.wait({run, disconnect}, timeout=deadline, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        disconnect.cancel()
+        if not run.done():
+            run.cancel()
+
+    try:
+        result_state = await run
+    except asyncio.CancelledError:
+        result_state = None
 
     # -------------------------------
-    # 4️⃣ 이번 턴 메시지 범위 계산
+    # 3️⃣ 답변 / source / Graph Flow 생성
     # -------------------------------
-    last_human_idx = None
-    for i in range(len(messages) - 1, -1, -1):
-        if isinstance(messages[i], HumanMessage):
-            last_human_idx = i
-            break
-
-    current_turn_messages = []
-    if last_human_idx is not None:
-        current_turn_messages = messages[last_human_idx + 1 :]
+    if result_state is not None:
+        response = _turn_response(req.thread_id, result_state)
+        await answer_cache.astore(req.question, question_vector, response)
+    else:
+        reason = "client disconnected" if disconnect.done() and not disconnect.cancelled() else f"deadline {deadline}s"
+        print(f"⏱ GRAPH CANCELLED ({reason}) — thread {req.thread_id}")
+        response = _partial_turn_response(req.thread_id, req.question, progress)
+        # 부분 답변도 대화 기록에 남겨 다음 턴 문맥이 끊기지 않도록 함 (답변 캐시에는 저장 안 함)
+        state = await graph.aget_state(config)
+        if current_question(state.values.get("messages", [])) == req.question:
+            await graph.aupdate_state(
+                config,
+                {"messages": [AIMessage(content=response["answer"])]},
+                as_node="summarize",
+            )
 
     # -------------------------------
-    # 5️⃣ ToolMessage 기반 source 수집
+    # 4️⃣ 최종 응답
     # -------------------------------
-    for m in current_turn_messages:
-        if isinstance(m, ToolMessage):
-            try:
-                data = json.loads(m.content)
-
-                # vector_search / search_docs 공통 처리
-                if isinstance(data, dict) and "documents" in data:
-                    for item in data["documents"]:
-                        current_turn_sources.append({
-                            "source": item.get("source"),
-                            "content": item.get("content"),
-                        })
-
-                elif isinstance(data, list):
-                    for item in data:
-                        current_turn_sources.append({
-                            "source": item.get("source"),
-                            "content": item.get("content"),
-                        })
-
-            except Exception:
-                pass
+    print("answer:::::::::::::",response["answer"])
+    print("sources:::::::::::::",response["sources"])
+    print("graph_flow:::::::::::::",response["graph_flow"])
+    return response
 
-    # 중복 제거
-    sources = list({
-        (s["source"], s["content"]): s
-        for s in current_turn_sources
-        if s.get("source") and s.get("content")
-    }.values())
 
-    # -------------------------------
-    # 6️⃣ Tool 사용 여부
-    # -------------------------------
-    tool_attempted = any(
-        isinstance(m, AIMessage) and m.tool_calls
-        for m in current_turn_messages
-    )
+# ==========================================================
+# Graph Stream (SSE)
+#  - node 전환 / tool 결과 / summarize 토큰을 생성되는 즉시 전송
+#  - event: node | tool | token | done | error
+# ==========================================================
+GRAPH_NODES = ("memory", "router", "agent", "tools", "vector_fallback", "summarize")
 
-    # -------------------------------
-    # 7️⃣ Vector Fallback (ToolMessage 방식)
-    # -------------------------------
-    vector_fallback_used = False
-
-    if not sources:
-        db = load_vector_store()
-        if db:
-            docs = db.similarity_search(req.question, k=3)
-
-            vector_docs = []
-            for d in docs:
-                vector_docs.append({
-                    "source": d.metadata.get("source", "vector_store"),
-                    "content": d.page_content[:800],
-                })
 
-            if vector_docs:
-                vector_fallback_used = True
-                sources = vector_docs
-
-                # ✅ ToolMessage ❌ → HumanMessage ✅
-                fallback_context = "\n\n".join(
-                    f"[{d['source']}]\n{d['content']}"
-                    for d in vector_docs
-                )
-
-                messages.append(
-                    HumanMessage(
-                        content=(
-                            "다음은 사내 문서(Vector Store)에서 검색된 참고 자료입니다.\n\n"
-                            f"{fallback_context}\n\n"
-                            "이 정보를 참고하여 최종 답변을 작성하세요."
-                        )
-                    )
-                )
-
-                # Summarize 재실행
-                result_state = await graph.ainvoke(
-                    {"messages": messages},
-                    config=config,
-                )
-                messages = result_state["messages"]
-
-                # 최종 답변 재추출
-                for m in reversed(messages):
-                    if isinstance(m, AIMessage) and m.content:
-                        answer = m.content
-                        break
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
 
-    # -------------------------------
-    # 8️⃣ Graph Flow 생성
-    # -------------------------------
-    graph_flow = ["User Question"]
 
-    if tool_attempted:
-        graph_flow.append("Agent → Tools")
-    else:
-        graph_flow.append("Agent Reasoning")
+async def _stream_graph_run(inputs: dict, config: dict):
+    """graph.astream_events → SSE 문자열"""
+    async for ev in graph.astream_events(inputs, config=config, version="v2"):
+        kind = ev["event"]
+        node = ev.get("metadata", {}).get("langgraph_node")
 
-    if vector_fallback_used:
-        graph_flow.append("Vector Fallback")
+        if kind == "on_chain_start" and ev.get("name") in GRAPH_NODES:
+            yield _sse("node", {"node": ev["name"]})
 
-    graph_flow.append("Summarize")
+        elif kind == "on_tool_end":
+            output = ev["data"].get("output")
+            content = getattr(output, "content", output)
+            artifact = getattr(output, "artifact", None) or {}
+            yield _sse("tool", {
+                "tool": ev.get("name"),
+                "content": content if isinstance(content, str) else str(content),
+                "documents": artifact.get("documents", []),
+            })
 
-    # -------------------------------
-    # 9️⃣ 최종 응답
-    # -------------------------------
-    print("answer:::::::::::::",answer)
-    print("sources:::::::::::::",sources)
-    print("graph_flow:::::::::::::",graph_flow)
-    return {
-        "thread_id": req.thread_id,
-        "answer": answer,
-        "sources": sources,
-        "graph_flow": graph_flow,
+        elif kind == "on_chat_model_stream" and node == "summarize":
+            chunk = ev["data"].get("chunk")
+            text = getattr(chunk, "content", "")
+            if text:
+                yield _sse("token", {"text": text})
+
+
+@app.get("/graph/cache/stats")
+def graph_cache_stats():
+    return answer_cache.answer_cache_stats()
+
+
+@app.get("/tools/stats")
+def tools_stats():
+    return tool_cache_stats()
+
+
+@app.get("/graph/checkpoints/stats")
+async def graph_checkpoints_stats():
+    return await checkpoint_stats()
+
+
+@app.get("/graph/llm/stats")
+def graph_llm_stats():
+    return llm_stats()
+
+
+@app.get("/graph/router/stats")
+def graph_router_stats():
+    return router_stats()
+
+
+@app.post("/graph/stream")
+async def graph_stream(req: ChatRequest):
+    config = {
+        "configurable": {
+            "thread_id": req.thread_id
+        }
     }
 
+    # 스트림이 시작되면 상태 코드를 바꿀 수 없으므로 대기열 확인은 시작 전에
+    llm_scheduler.check_admission()
+
+    async def event_source():
+        try:
+            cached, question_vector = await _answer_cache_lookup(req.question, config)
+            if cached:
+                yield _sse("done", await _cached_turn_response(
+                    req.thread_id, req.question, cached, config
+                ))
+                return
+
+            async for line in _stream_graph_run(
+                {
+                    "messages": [HumanMessage(content=req.question)],
+                    "fallback_sources": [],
+                    "tool_timings": [],
+                    "prefetched": {},
+                },
+                config,
+            ):
+                yield line
+
+            state = await graph.aget_state(config)
+            response = _turn_response(req.thread_id, state.values)
+            await answer_cache.astore(req.question, question_vector, response)
+            yield _sse("done", response)
+
+        except LlmOverloaded as e:
+            yield _sse("error", {"detail": str(e), "retry_after": e.retry_after})
+        except Exception as e:
+            yield _sse("error", {"detail": str(e)})
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# ==========================================================
+# Graph Batch (SSE)
+#  - 질문 목록을 받아 동일 질문은 한 번만 처리 (정규화 후 중복 제거)
+#  - vector 검색은 전체 질문을 한 번에 임베딩 + FAISS 검색 1회로 미리 수행해서
+#    각 질문의 prefetched state 로 넘김 (graph 안에서 다시 검색하지 않음)
+#  - LLM 단계는 BATCH_MAX_CONCURRENCY 개씩, 대화형 요청보다 낮은 우선순위로 실행
+#  - 질문별 결과는 끝나는 순서대로 전송
+#  - event: retrieval | result | done
+# ==========================================================
+BATCH_MAX_QUESTIONS = int(os.getenv("BATCH_MAX_QUESTIONS", "100"))
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "2"))
+
+
+class BatchRequest(BaseModel):
+    questions: List[str]
+    # 질문별 thread 는 "{thread_id}-{번호}" (없으면 새로 생성)
+    thread_id: Optional[str] = None
+
+
+def _normalize_question(question: str) -> str:
+    return " ".join(question.split()).lower()
+
+
+async def _answer_batch_question(thread_id: str, question: str, prefetched: dict, vector) -> dict:
+    config = {"configurable": {"thread_id": thread_id}}
+
+    # batch 임베딩 결과를 그대로 사용 (질문별 재임베딩 없음)
+    cached, question_vector = await _answer_cache_lookup(question, config, vector)
+    if cached:
+        return await _cached_turn_response(thread_id, question, cached, config)
+
+    values = await graph.ainvoke(
+        {
+            "messages": [HumanMessage(content=question)],
+            "fallback_sources": [],
+            "tool_timings": [],
+            "prefetched": prefetched,
+        },
+        config=config,
+    )
+    response = _turn_response(thread_id, values)
+    await answer_cache.astore(question, question_vector, response)
+    return response
+
+
+@app.post("/graph/batch")
+async def graph_batch(req: BatchRequest):
+    questions = [q for q in req.questions if q.strip()]
+    if not questions:
+        raise HTTPException(status_code=400, detail="questions 가 비어 있습니다.")
+    if len(questions) > BATCH_MAX_QUESTIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"한 번에 최대 {BATCH_MAX_QUESTIONS}개 질문까지 처리할 수 있습니다.",
+        )
+
+    llm_scheduler.check_admission()
+    batch_id = req.thread_id or uuid.uuid4().hex
+
+    # 정규화 기준 중복 제거 (원래 순서 유지)
+    unique: dict = {}
+    for q in questions:
+        unique.setdefault(_normalize_question(q), q)
+    unique_questions = list(unique.values())
+
+    async def event_source():
+        started = time.perf_counter()
+        # 이 generator 에서 만든 task 의 LLM 호출은 batch 우선순위로 대기
+        llm_priority.set(PRIORITY_BATCH)
+
+        try:
+            prefetched, vectors = await batch_prefetch(unique_questions)
+        except Exception as e:
+            print("⚠️ BATCH RETRIEVAL ERROR =>", e)
+            prefetched = [{} for _ in unique_questions]
+            vectors = [None for _ in unique_questions]
+        yield _sse("retrieval", {
+            "questions": len(questions),
+            "unique": len(unique_questions),
+            "ms": round((time.perf_counter() - started) * 1000),
+        })
+
+        semaphore = asyncio.Semaphore(BATCH_MAX_CONCURRENCY)
+
+        async def run(i: int, question: str, pre: dict, vector):
+            thread_id = f"{batch_id}-{i}"
+            async with semaphore:
+                try:
+                    return question, await _answer_batch_question(thread_id, question, pre, vector)
+                except LlmOverloaded as e:
+                    return question, {"thread_id": thread_id, "error": str(e), "retry_after": e.retry_after}
+                except Exception as e:
+                    return question, {"thread_id": thread_id, "error": str(e)}
+
+        tasks = [
+            asyncio.create_task(run(i, q, pre, v))
+            for i, (q, pre, v) in enumerate(zip(unique_questions, prefetched, vectors))
+        ]
+        failed = 0
+        try:
+            for fut in asyncio.as_completed(tasks):
+                question, response = await fut
+                failed += "error" in response
+                key = _normalize_question(question)
+                # 중복 질문에는 같은 결과를 원래 위치(index)로 전달
+                for index, q in enumerate(questions):
+                    if _normalize_question(q) == key:
+                        yield _sse("result", {"index": index, "question": q, **response})
+        finally:
+            # 클라이언트가 끊으면 남은 질문 처리 취소
+            for t in tasks:
+                t.cancel()
+
+        yield _sse("done", {
+            "questions": len(questions),
+            "unique": len(unique_questions),
+            "failed": failed,
+            "elapsed": round(time.perf_counter() - started, 3),
+        })
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 
 # ==========================================================
 # Reports / Upload
@@ -253,6 +650,22 @@ def report_list():
     return list_reports()
 
 
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# APP_STATE_DIR 가 지정되면 업로드 파일도 그 아래에 저장 (벤치마크 격리)
+UPLOAD_DIR = (
+    Path(os.environ["APP_STATE_DIR"]) / "pmo_docs"
+    if os.getenv("APP_STATE_DIR")
+    else Path(__file__).resolve().parent.parent / "data" / "pmo_docs"
+)
+
+
+def _spool_upload(src, save_path: Path):
+    tmp_path = save_path.with_name(save_path.name + ".part")
+    with open(tmp_path, "wb") as buffer:
+        shutil.copyfileobj(src, buffer, UPLOAD_CHUNK_SIZE)
+    tmp_path.replace(save_path)
+
+
 @app.post("/projects/{project_name}/upload-report")
 async def upload_report(
     project_name: str,
@@ -267,37 +680,55 @@ async def upload_report(
             detail="PDF 또는 Excel(xlsx,csv)만 업로드 가능합니다",
         )
 
-    binary = await file.read()
-
-    BASE_DIR = Path(__file__).resolve().parent.parent
-    UPLOAD_DIR = BASE_DIR / "data" / "pmo_docs"
     UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 
+    # 업로드 내용을 메모리에 통째로 올리지 않고 chunk 단위로 디스크에 기록
     save_path = UPLOAD_DIR / filename
-    with open(save_path, "wb") as buffer:
-        buffer.write(binary)
-
-    texts = extract_text(binary, filename)
-    sources = [filename] * len(texts)
+    await run_blocking(_spool_upload, file.file, save_path)
 
-    build_vector_store(texts, sources)
+    # 파싱/임베딩은 워커에서 처리 → job id 만 바로 반환
+    job_id = submit_ingest_job(save_path, filename)
 
     return {
         "status": "accepted",
-        "chunks": len(texts),
+        "job_id": job_id,
     }
 
 
+@app.get("/jobs/{job_id}")
+def job_status(job_id: str):
+    job = get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="job not found")
+    return job
+
+
+@app.get("/hr/tables")
+def hr_tables():
+    return list_tables()
+
+
+@app.get("/hr/aggregate")
+def hr_aggregate(
+    group_by: str = Query(""),
+    filters: str = Query(""),
+    table: str = Query(""),
+):
+    result = aggregate(group_by=group_by, filters=filters, table=table)
+    if "error" in result:
+        raise HTTPException(status_code=404, detail=result["error"])
+    return result
+
+
 @app.get("/search")
 async def search_docs(question: str = Query(...)):
-    db = load_vector_store()
-    if not db:
+    results = await asimilarity_search(question, k=4)
+    if results is None:
         raise HTTPException(
             status_code=400,
             detail="Vector index not yet created.",
         )
 
-    results = db.similarity_search(question, k=4)
     return [
         {
             "source": d.metadata.get("source", "unknown"),
@@ -305,3 +736,21 @@ async def search_docs(question: str = Query(...)):
         }
         for d in results
     ]
+
+
+@app.get("/search/stats")
+def search_stats():
+    return vector_cache_stats()
+
+
+@app.get("/runtime/stats")
+def runtime_stats():
+    return {
+        "event_loop": loop_lag_stats(),
+        "blocking_pool": blocking_pool_stats(),
+    }
+
+
+@app.get("/embeddings/stats")
+def embeddings_stats():
+    return cache_stats()
@@ -11,6 +11,12 @@ def get_conn():
     return sqlite3.connect(DB_FILE)
 
 
+def db_version():
+    """PMO DB 변경 감지용 (mtime_ns, size)"""
+    st = DB_FILE.stat()
+    return st.st_mtime_ns, st.st_size
+
+
 def init_db():
     conn = get_conn()
     cur = conn.cursor()
@@ -88,6 +94,15 @@ def fetch_project(name):
     return row
 
 
+def list_project_names():
+    conn = get_conn()
+    cur = conn.cursor()
+    cur.execute("SELECT DISTINCT name FROM projects")
+    rows = [r[0] for r in cur.fetchall()]
+    conn.close()
+    return rows
+
+
 def fetch_milestones(project_id):
     conn = get_conn()
     cur = conn.cursor()
@@ -203,4 +218,5 @@ def list_reports():
 
     rows = cur.fetchall()
     conn.close()
-    return rows
\ No newline at end of file
+    return rows
+
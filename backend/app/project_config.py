@@ -1,8 +1,15 @@
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
-from functools import lru_cache
+from functools import lru_cache, wraps
 from datetime import date
 from langchain_core.tools import tool
-from .pmo_db import fetch_project, fetch_milestones, summarize_project_status
+from .pmo_db import fetch_project, fetch_milestones, summarize_project_status, db_version
+from .hr_db import aggregate, tables_version
+from .blocking import run_blocking
 
 
 # 🔽 ID/이름을 PMO 비서용으로 변경
@@ -35,6 +42,15 @@ BASE_DIR = Path(__file__).resolve().parent
 DATA_DIR = BASE_DIR / "data" / "hr_policies"
 
 
+def docs_fingerprint():
+    """hr_policies 문서 변경 감지용 (파일명, mtime_ns, size) 목록"""
+    return tuple(
+        (path.name, st.st_mtime_ns, st.st_size)
+        for path in sorted(DATA_DIR.glob("*.txt"))
+        for st in (path.stat(),)
+    )
+
+
 @lru_cache()
 def load_docs():
     docs = []
@@ -54,47 +70,191 @@ def load_docs():
     return docs
 
 
-@tool
-def search_docs(query: str) -> str:
-    """사내 인사/복지/근태/보안 규정 문서에서 질의와 관련된 내용을 찾아 반환합니다."""
+# =========================
+# Tool 결과 캐시 (TTL + LRU)
+#  - key: (tool 이름, 인자) — 자유 텍스트 질의(search_docs)만 대소문자/앞뒤 공백 정규화
+#    (프로젝트명 / 필터 값은 SQL 에서 대소문자를 구분하므로 그대로 사용)
+#  - 데이터 버전(PMO DB / 규정 문서 / HR 표)이 바뀌면 해당 tool 캐시 전체 무효화
+# =========================
+TOOL_CACHE_TTL = float(os.getenv("TOOL_CACHE_TTL", "300"))
+TOOL_CACHE_MAX = int(os.getenv("TOOL_CACHE_MAX", "256"))
+
+_tool_cache_lock = threading.Lock()
+_tool_caches: dict = {}
+
+
+def _normalize_arg(value):
+    # search_docs 가 질의에 적용하는 정규화(strip + lower)와 동일해야 결과가 같음
+    if isinstance(value, str):
+        return value.strip().lower()
+    return value
+
+
+def _docs_version():
+    version = docs_fingerprint()
+    # 문서가 바뀌면 load_docs 의 lru_cache 도 같이 비움
+    if _tool_caches.get("search_docs", {}).get("version") not in (None, version):
+        load_docs.cache_clear()
+    return version
+
+
+def cached_tool(name: str, version, normalize: bool = False):
+    """tool 함수 결과 memoize (normalize=True 이면 문자열 인자를 정규화해서 key 로 사용)"""
+    key_arg = _normalize_arg if normalize else (lambda v: v)
+
+    def decorator(func):
+        with _tool_cache_lock:
+            _tool_caches[name] = {
+                "entries": OrderedDict(),
+                "version": None,
+                "hits": 0,
+                "misses": 0,
+            }
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            cache = _tool_caches[name]
+            key = (
+                tuple(key_arg(a) for a in args),
+                tuple(sorted((k, key_arg(v)) for k, v in kwargs.items())),
+            )
+            current = version()
+            now = time.time()
+
+            with _tool_cache_lock:
+                if cache["version"] != current:
+                    cache["entries"].clear()
+                    cache["version"] = current
+
+                hit = cache["entries"].get(key)
+                if hit and now - hit[0] < TOOL_CACHE_TTL:
+                    cache["entries"].move_to_end(key)
+                    cache["hits"] += 1
+                    return hit[1]
+                cache["misses"] += 1
+
+            result = func(*args, **kwargs)
+
+            with _tool_cache_lock:
+                if cache["version"] == current:
+                    cache["entries"][key] = (now, result)
+                    cache["entries"].move_to_end(key)
+                    while len(cache["entries"]) > TOOL_CACHE_MAX:
+                        cache["entries"].popitem(last=False)
+            return result
+
+        return wrapper
+    return decorator
+
+
+def tool_cache_stats() -> dict:
+    with _tool_cache_lock:
+        return {
+            name: {
+                "hits": c["hits"],
+                "misses": c["misses"],
+                "entries": len(c["entries"]),
+            }
+            for name, c in _tool_caches.items()
+        }
+
+
+# =========================
+# Tool 결과 형식
+#  - content: LLM 에게 보여줄 텍스트
+#  - artifact: 엔드포인트가 그대로 읽는 구조화 결과
+#    {"documents": [{"source", "content", "score", "snippet"}]}
+#    (ToolMessage.artifact 로 전달되며 LLM 프롬프트에는 포함되지 않음)
+# =========================
+def _artifact(documents: list[dict]) -> dict:
+    return {"documents": documents}
+
+
+# =========================
+# 문서 검색어 추출
+#  - 자연어 질문 전체가 문서에 그대로 나오는 경우는 거의 없으므로 단어 단위로 점수 계산
+#  - 끝에 붙은 한 글자 조사는 떼고, 질문 어미 같은 흔한 단어는 제외
+# =========================
+_TERM_PATTERN = re.compile(r"[0-9A-Za-z가-힣]+")
+_TRAILING_JOSA = "은는이가을를에의도로와과만"
+_STOPWORDS = {
+    "알려줘", "알려주세요", "뭐야", "뭐예요", "궁금해", "궁금합니다", "어떻게",
+    "있어", "있나요", "해줘", "정리해줘", "관련", "대해", "대한", "무엇",
+}
+
+
+def query_terms(query: str) -> list[str]:
+    """'연차는 며칠까지 쓸 수 있어?' → ['연차', '며칠까지']"""
+    terms = []
+    for word in _TERM_PATTERN.findall(query.lower()):
+        if len(word) > 2 and word[-1] in _TRAILING_JOSA:
+            word = word[:-1]
+        if len(word) < 2 or word in _STOPWORDS or word in terms:
+            continue
+        terms.append(word)
+    return terms
+
+
+# =========================
+# Tools
+#  - 실제 조회(파일 스캔 / SQLite)는 동기 함수로 두고 캐시 적용
+#  - tool 자체는 async → ToolNode 가 이벤트 루프를 막지 않고 blocking pool 에서 실행
+# =========================
+@cached_tool("search_docs", _docs_version, normalize=True)
+def _search_docs(query: str) -> tuple[str, dict]:
     query_norm = query.strip().lower()
     docs = load_docs()
 
     if not docs:
-        return "현재 로드된 문서가 없습니다. 관리자가 데이터를 추가해야 합니다."
+        return "현재 로드된 문서가 없습니다. 관리자가 데이터를 추가해야 합니다.", _artifact([])
 
     if not query_norm:
         summaries = []
+        documents = []
         for d in docs:
             summaries.append(
                 f"[{d['title']} / {d['path']}]\n"
                 f"{d['content'][:200]}..."
             )
-        return "\n\n".join(summaries)
+            documents.append({
+                "source": d["path"],
+                "content": d["content"][:800],
+                "score": 0,
+                "snippet": d["content"][:200],
+            })
+        return "\n\n".join(summaries), _artifact(documents)
+
+    terms = query_terms(query_norm) or [query_norm]
 
     scored = []
     for d in docs:
         content_lower = d["content"].lower()
-        score = content_lower.count(query_norm)
-        if query_norm in d["title"].lower():
-            score += 3
+        title_lower = d["title"].lower()
+        score = 0
+        for term in terms:
+            score += content_lower.count(term)
+            if term in title_lower:
+                score += 3
         if score > 0:
             scored.append((score, d))
 
     if not scored:
-        return "현재 제공된 샘플 데이터에서 관련 정보를 찾지 못했습니다. 키워드를 바꿔 다시 시도해 주세요."
+        return (
+            "현재 제공된 샘플 데이터에서 관련 정보를 찾지 못했습니다. 키워드를 바꿔 다시 시도해 주세요.",
+            _artifact([]),
+        )
 
     scored.sort(key=lambda x: x[0], reverse=True)
-    top_docs = [d for _, d in scored[:3]]
 
     snippets = []
-    for d in top_docs:
+    documents = []
+    for score, d in scored[:3]:
         lines = d["content"].splitlines()
         body_lines = lines[1:]
         hit_lines = [
             ln.strip()
             for ln in body_lines
-            if query_norm in ln.lower()
+            if any(term in ln.lower() for term in terms)
         ]
         if not hit_lines:
             hit_lines = [ln.strip() for ln in body_lines[:3]]
@@ -102,21 +262,29 @@ def search_docs(query: str) -> str:
         snippets.append(
             f"[{d['title']} / {d['path']}]\n{snippet}"
         )
+        documents.append({
+            "source": d["path"],
+            "content": snippet,
+            "score": score,
+            "snippet": snippet,
+        })
 
-    return "\n\n".join(snippets)
+    return "\n\n".join(snippets), _artifact(documents)
 
 
-@tool
-def analyze_project_status(project_name: str) -> str:
-    """
-    실제 PMO DB의 프로젝트, 마일스톤 데이터를 분석하여
-    일정 리스크 상태를 텍스트로 요약합니다.
-    """
+@tool(response_format="content_and_artifact")
+async def search_docs(query: str) -> tuple[str, dict]:
+    """사내 인사/복지/근태/보안 규정 문서에서 질의와 관련된 내용을 찾아 반환합니다."""
+    return await run_blocking(_search_docs, query)
+
 
+# 지연 일수가 날짜에 따라 바뀌므로 오늘 날짜도 버전에 포함
+@cached_tool("analyze_project_status", lambda: (db_version(), date.today()))
+def _analyze_project_status(project_name: str) -> tuple[str, dict]:
     row = fetch_project(project_name)
 
     if not row:
-        return f"DB에 '{project_name}' 프로젝트가 존재하지 않습니다."
+        return f"DB에 '{project_name}' 프로젝트가 존재하지 않습니다.", _artifact([])
 
     pid, name, manager, progress = row
 
@@ -161,4 +329,62 @@ def analyze_project_status(project_name: str) -> str:
 
     lines.append(f"\n⚠ 종합 리스크 등급: {risk}")
 
-    return "\n".join(lines)
\ No newline at end of file
+    text = "\n".join(lines)
+    return text, _artifact([{
+        "source": f"PMO DB / {name}",
+        "content": text,
+        "score": None,
+        "snippet": f"진행률 {progress}% / 리스크 {risk}",
+    }])
+
+
+@tool(response_format="content_and_artifact")
+async def analyze_project_status(project_name: str) -> tuple[str, dict]:
+    """
+    실제 PMO DB의 프로젝트, 마일스톤 데이터를 분석하여
+    일정 리스크 상태를 텍스트로 요약합니다.
+    """
+    return await run_blocking(_analyze_project_status, project_name)
+
+
+@cached_tool("aggregate_hr_data", tables_version)
+def _aggregate_hr_data(group_by: str = "", filters: str = "", table: str = "") -> tuple[str, dict]:
+    result = aggregate(group_by=group_by, filters=filters, table=table)
+
+    if "error" in result:
+        return result["error"], _artifact([])
+
+    t = result["table"]
+    lines = [f"📊 데이터: {t['source']} / {t['sheet']} (전체 {t['row_count']}행)"]
+
+    if result["filters"]:
+        cond = ", ".join(f"{c}={v}" for c, v in result["filters"])
+        lines.append(f"조건: {cond}")
+
+    lines.append(f"해당 인원: {result['total']}명")
+
+    if result["group_by"]:
+        lines.append(f"\n{result['group_by']}별 인원")
+        lines.extend(f" - {value}: {n}명" for value, n in result["groups"])
+    else:
+        lines.append(f"\n사용 가능한 컬럼: {', '.join(result['columns'])}")
+
+    text = "\n".join(lines)
+    return text, _artifact([{
+        "source": f"{t['source']} / {t['sheet']}",
+        "content": text,
+        "score": None,
+        "snippet": f"해당 인원 {result['total']}명",
+    }])
+
+
+@tool(response_format="content_and_artifact")
+async def aggregate_hr_data(group_by: str = "", filters: str = "", table: str = "") -> tuple[str, dict]:
+    """
+    업로드된 인사 엑셀 전체 데이터(HR 표)에서 인원수 집계를 수행합니다.
+    - group_by: 그룹으로 묶을 컬럼명 (예: "role", "dept"). 비우면 전체 건수만 계산
+    - filters: "컬럼=값" 을 쉼표로 구분 (예: "dept=개발1팀, role=Backend")
+    - table: 파일명 또는 sheet 이름 일부 (비우면 컬럼이 맞는 최신 표 사용)
+    직무별/부서별 인원 분포처럼 건수/분포를 묻는 질문에 사용합니다.
+    """
+    return await run_blocking(_aggregate_hr_data, group_by, filters, table)
@@ -0,0 +1,241 @@
+import os
+import re
+import threading
+import uuid
+
+import numpy as np
+
+from .hr_db import list_tables
+from .pmo_db import list_project_names
+from .vector_store import embeddings
+
+
+# =========================
+# Fast-path Query Router
+#  - agent LLM(tool 바인딩) 호출 전에 질문 의도를 가볍게 분류
+#  - 1) 키워드 규칙 → 2) 예시 질문 임베딩 centroid 최근접 → 3) 애매하면 agent(LLM)
+#  - 확신이 있는 경우 tool 직접 호출 / 문서 검색 / 바로 summarize 로 보냄
+# =========================
+ROUTER_ENABLED = os.getenv("ROUTER_ENABLED", "1") == "1"
+ROUTER_MIN_SIM = float(os.getenv("ROUTER_MIN_SIM", "0.75"))
+ROUTER_MIN_MARGIN = float(os.getenv("ROUTER_MIN_MARGIN", "0.05"))
+
+SMALLTALK_PATTERN = re.compile(
+    r"^\s*(안녕|반가|고마|감사|수고|좋은\s*(아침|하루)|hi\b|hello\b|thanks?\b|ㅎㅇ|ㄱㅅ)",
+    re.IGNORECASE,
+)
+SMALLTALK_MAX_LEN = 20
+
+POLICY_KEYWORDS = [
+    "연차", "휴가", "복지", "근태", "출퇴근", "재택", "보안",
+    "규정", "경조", "출장", "휴직", "급여", "수당",
+]
+
+AGGREGATE_PATTERN = re.compile(r"(인원|분포|몇\s*명|인원수|head\s*count)", re.IGNORECASE)
+GROUP_BY_PATTERN = re.compile(r"(\S+?)\s*별")
+
+# 한국어 표현 → 엑셀 컬럼명 후보
+COLUMN_ALIASES = {
+    "직무": ["role", "job", "직무", "직군"],
+    "부서": ["dept", "department", "부서", "team", "팀"],
+    "팀": ["team", "팀", "dept", "department", "부서"],
+    "직급": ["level", "grade", "position", "직급", "직위"],
+    "성별": ["gender", "sex", "성별"],
+    "지역": ["location", "region", "지역", "근무지"],
+}
+
+# centroid 용 예시 질문 (intent → 질문 목록)
+#  - policy: 규정 문서 검색 후 답변
+#  - smalltalk: 검색 없이 바로 답변
+#  - analysis: 판단이 필요한 질문 → agent
+INTENT_EXAMPLES = {
+    "policy": [
+        "연차는 며칠까지 쓸 수 있어?",
+        "재택근무 규정 알려줘",
+        "경조사 휴가 기준이 뭐야?",
+        "보안 서약 관련 규정을 알려줘",
+        "역량 기반 평가 기준을 정리해줘",
+        "출장비 정산 방법이 궁금해",
+    ],
+    "smalltalk": [
+        "안녕하세요",
+        "고마워요",
+        "너는 누구야?",
+        "무엇을 도와줄 수 있어?",
+        "수고했어",
+    ],
+    "analysis": [
+        "이 직무에 필요한 핵심 스킬 Top 5는 뭐야?",
+        "현재 우리 팀의 스킬 갭은 어디에 있어?",
+        "이 직원에게 추천할 다음 커리어 경로는?",
+        "입사 1~2년 차 이탈 위험 신호를 알려줘",
+        "사내 데이터로 Talent 대시보드 구성안 만들어줘",
+        "프로젝트 일정 리스크를 분석해줘",
+    ],
+}
+# policy: FAISS 인덱스에는 엑셀 행만 있으므로 규칙 경로처럼 search_docs(규정 문서) 호출
+CENTROID_TARGETS = {
+    "policy": "tools",
+    "smalltalk": "summarize",
+    "analysis": "agent",
+}
+
+_lock = threading.Lock()
+_centroids = None
+_centroid_failed = False
+_stats = {"total": 0, "rule": 0, "centroid": 0, "llm": 0, "intents": {}}
+
+
+def _tool_call(name: str, args: dict) -> dict:
+    return {"name": name, "args": args, "id": f"router_{uuid.uuid4().hex[:8]}", "type": "tool_call"}
+
+
+def _route(target: str, method: str, intent: str, tool_calls=None) -> dict:
+    return {
+        "target": target,
+        "method": method,
+        "intent": intent,
+        "tool_calls": tool_calls or [],
+    }
+
+
+# =========================
+# 1) 키워드 규칙
+# =========================
+def _resolve_group_column(question: str):
+    match = GROUP_BY_PATTERN.search(question)
+    if not match:
+        return None
+
+    word = match.group(1)
+    candidates = [word.lower()]
+    for alias, names in COLUMN_ALIASES.items():
+        if alias in word:
+            candidates.extend(n.lower() for n in names)
+
+    for t in list_tables():
+        for c in t["columns"]:
+            if c["name"].lower() in candidates:
+                return c["name"]
+    return None
+
+
+def _rule_route(question: str):
+    q = question.strip()
+
+    projects = [name for name in list_project_names() if name and name in q]
+    if projects:
+        return _route(
+            "tools", "rule", "project",
+            [_tool_call("analyze_project_status", {"project_name": p}) for p in projects],
+        )
+
+    if AGGREGATE_PATTERN.search(q):
+        column = _resolve_group_column(q)
+        if column:
+            return _route(
+                "tools", "rule", "aggregate",
+                [_tool_call("aggregate_hr_data", {"group_by": column})],
+            )
+
+    keywords = [k for k in POLICY_KEYWORDS if k in q]
+    if keywords:
+        return _route(
+            "tools", "rule", "policy",
+            [_tool_call("search_docs", {"query": keywords[0]})],
+        )
+
+    if len(q) <= SMALLTALK_MAX_LEN and SMALLTALK_PATTERN.search(q):
+        return _route("summarize", "rule", "smalltalk")
+
+    return None
+
+
+# =========================
+# 2) centroid 최근접
+# =========================
+def _normalize(v) -> np.ndarray:
+    v = np.asarray(v, dtype=np.float32)
+    return v / (np.linalg.norm(v, axis=-1, keepdims=True) + 1e-12)
+
+
+def _get_centroids():
+    """예시 질문 임베딩 평균 (embedding_cache 덕분에 재시작 후에도 Ollama 재호출 없음)"""
+    global _centroids, _centroid_failed
+
+    with _lock:
+        if _centroids is not None or _centroid_failed:
+            return _centroids
+        try:
+            centroids = {}
+            for intent, examples in INTENT_EXAMPLES.items():
+                vectors = _normalize(embeddings.embed_documents(examples))
+                centroids[intent] = _normalize(vectors.mean(axis=0))
+            _centroids = centroids
+        except Exception as e:
+            print("⚠️ ROUTER CENTROID DISABLED =>", e)
+            _centroid_failed = True
+        return _centroids
+
+
+def _centroid_route(question: str):
+    centroids = _get_centroids()
+    if not centroids:
+        return None
+
+    q = _normalize(embeddings.embed_query(question))
+    scored = sorted(
+        ((float(q @ c), intent) for intent, c in centroids.items()),
+        reverse=True,
+    )
+    (best, intent), (second, _) = scored[0], scored[1]
+
+    if best < ROUTER_MIN_SIM or best - second < ROUTER_MIN_MARGIN:
+        return None
+
+    target = CENTROID_TARGETS[intent]
+    if target == "agent":
+        return None
+    if target == "tools":
+        return _route(
+            target, "centroid", intent,
+            [_tool_call("search_docs", {"query": question.strip()})],
+        )
+    return _route(target, "centroid", intent)
+
+
+# =========================
+# 진입점
+# =========================
+def route_question(question: str) -> dict:
+    """
+    반환: {"target": agent|tools|summarize, "method", "intent", "tool_calls"}
+    (동기 함수: 그래프에서는 스레드에서 실행)
+    """
+    route = None
+    if ROUTER_ENABLED and question.strip():
+        try:
+            route = _rule_route(question) or _centroid_route(question)
+        except Exception as e:
+            print("⚠️ ROUTER ERROR =>", e)
+            route = None
+
+    if route is None:
+        route = _route("agent", "llm", "ambiguous")
+
+    with _lock:
+        _stats["total"] += 1
+        _stats[route["method"]] += 1
+        _stats["intents"][route["intent"]] = _stats["intents"].get(route["intent"], 0) + 1
+
+    return route
+
+
+def router_stats() -> dict:
+    with _lock:
+        total = _stats["total"] or 1
+        return {
+            **{k: v for k, v in _stats.items() if k != "intents"},
+            "intents": dict(_stats["intents"]),
+            "fast_path_rate": round((_stats["rule"] + _stats["centroid"]) / total, 3),
+        }
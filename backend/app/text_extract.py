@@ -1,44 +1,131 @@
 import os
 from io import BytesIO
+from pathlib import Path
+from typing import Iterator
+from zipfile import BadZipFile
 
 import pandas as pd
+from langchain_core.documents import Document
 from openpyxl import load_workbook
+from openpyxl.utils.exceptions import InvalidFileException
 
 
 def extract_text(binary: bytes, filename: str):
     ext = os.path.splitext(filename)[1].lower()
-    print("변환 시작 :::"+ext)
-    print("binary :::", binary)
-    print(binary[:0])
-    print(binary[:1])
-    print(binary[:2])
-    print(binary[:3])
+    print("변환 시작 :::" + ext, f"({len(binary)} bytes)")
+
+    return convert_df_to_texts(_read_dataframe(BytesIO(binary), ext))
+
+
+def extract_text_from_path(path: Path, filename: str):
+    """
+    디스크에 저장된 업로드 파일을 바로 파싱 (bytes 를 메모리에 올리지 않음).
+    XLSX 는 모든 sheet 를 한 번만 읽는다.
+    """
+    return [d.page_content for d in iter_row_documents(path, filename)]
+
+
+# =========================
+# 행 단위 스트리밍 추출
+#  - XLSX: openpyxl read-only iter_rows 로 모든 sheet 를 순회
+#  - CSV : pandas chunksize 로 나눠 읽기
+#  - 행 하나 = Document 하나 (metadata: source, sheet, row)
+#  - generator 이므로 호출 측(임베딩)이 파싱 완료를 기다리지 않음
+#  - on_row(sheet, header, values): 같은 pass 에서 원본 셀 값이 필요한 경우(HR 표 적재)
+# =========================
+CSV_CHUNK_ROWS = 5000
+
+
+def iter_row_documents(path: Path, filename: str, on_row=None) -> Iterator[Document]:
+    ext = os.path.splitext(filename)[1].lower()
+    print("변환 시작 :::" + ext, f"({path.stat().st_size} bytes)")
 
     if ext == ".xlsx":
-        if is_valid_xlsx(binary):
-            df = pd.read_excel(BytesIO(binary), engine="openpyxl")
-        else:
-            # CSV fallback
+        try:
+            wb = load_workbook(path, read_only=True, data_only=True)
+        except (BadZipFile, InvalidFileException, KeyError):
+            # 확장자만 xlsx 인 CSV 파일 fallback
             try:
-                df = pd.read_csv(BytesIO(binary))
+                yield from _iter_csv_rows(path, filename, on_row)
             except Exception:
                 raise ValueError("엑셀 형식이 아닙니다. 올바른 XLSX 또는 CSV 파일을 업로드하세요.")
+            return
+
+        try:
+            for ws in wb.worksheets:
+                yield from _iter_sheet_rows(ws, filename, on_row)
+        finally:
+            wb.close()
 
     elif ext == ".csv":
-        df = pd.read_csv(BytesIO(binary))
+        yield from _iter_csv_rows(path, filename, on_row)
 
     else:
         raise ValueError("지원하지 않는 파일 형식")
 
-    return convert_df_to_texts(df)
 
+def _iter_sheet_rows(ws, filename: str, on_row=None) -> Iterator[Document]:
+    header = None
+
+    for row_no, values in enumerate(ws.iter_rows(values_only=True), start=1):
+        # 첫 번째 비어있지 않은 행을 header 로 사용
+        if header is None:
+            if any(v is not None and str(v).strip() for v in values):
+                header = [
+                    str(v).strip() if v is not None and str(v).strip() else f"Unnamed: {i}"
+                    for i, v in enumerate(values)
+                ]
+            continue
+
+        if on_row:
+            on_row(ws.title, header, values)
+
+        cells = []
+        for i, value in enumerate(values):
+            if value is None or (isinstance(value, str) and not value.strip()):
+                continue
+            col = header[i] if i < len(header) else f"Unnamed: {i}"
+            cells.append(f"{col}: {value}")
+
+        if cells:
+            yield Document(
+                page_content="\n".join(cells),
+                metadata={"source": filename, "sheet": ws.title, "row": row_no},
+            )
+
+
+def _iter_csv_rows(path: Path, filename: str, on_row=None) -> Iterator[Document]:
+    for df in pd.read_csv(path, chunksize=CSV_CHUNK_ROWS):
+        if on_row:
+            header = [str(c) for c in df.columns]
+            for values in df.itertuples(index=False, name=None):
+                on_row("csv", header, values)
+        for idx, text in serialize_rows(df).items():
+            yield Document(
+                page_content=text,
+                # header 가 1행이므로 데이터 행 번호는 index + 2
+                metadata={"source": filename, "sheet": None, "row": int(idx) + 2},
+            )
+
+
+def _read_dataframe(src, ext: str) -> pd.DataFrame:
+    if ext == ".xlsx":
+        # 사전 검증(load_workbook) 없이 바로 파싱하고, 실패하면 CSV fallback
+        try:
+            return pd.read_excel(src, engine="openpyxl")
+        except (BadZipFile, InvalidFileException, KeyError, ValueError):
+            if hasattr(src, "seek"):
+                src.seek(0)
+            try:
+                return pd.read_csv(src)
+            except Exception:
+                raise ValueError("엑셀 형식이 아닙니다. 올바른 XLSX 또는 CSV 파일을 업로드하세요.")
+
+    elif ext == ".csv":
+        return pd.read_csv(src)
 
-def is_valid_xlsx(binary):
-    try:
-        load_workbook(BytesIO(binary), read_only=True)
-        return True
-    except Exception:
-        return False
+    else:
+        raise ValueError("지원하지 않는 파일 형식")
 
 
 def convert_df_to_texts(df: pd.DataFrame) -> list[str]:
@@ -47,23 +134,35 @@ def convert_df_to_texts(df: pd.DataFrame) -> list[str]:
     - 완전히 비어있는 행은 제거
     - 각 행: "컬럼명: 값" 형식으로 줄바꿈하여 하나의 텍스트로 만듦
     """
-    # 완전히 빈 행은 제거
-    df = df.dropna(how="all")
+    return serialize_rows(df).tolist()
 
-    texts: list[str] = []
 
-    for _, row in df.iterrows():
-        cells = []
+# =========================
+# 공용 행 직렬화 (iterrows 대체)
+#  - 컬럼 단위로 "컬럼명: 값" 문자열을 한 번에 만들고, null mask 로 빈 셀을 지운 뒤
+#    행별로 join 한다. (행마다 Series 를 만드는 iterrows / 셀마다 pd.isna 호출 제거)
+#  - text_extract / excel_report / build_vector_index 공통 사용
+# =========================
+def serialize_rows(df: pd.DataFrame, sep: str = "\n") -> pd.Series:
+    """
+    DataFrame → 행 텍스트 Series (index 유지).
+    NaN/None 셀은 건너뛰고, 완전히 비어있는 행은 결과에서 제외한다.
+    """
+    df = df.dropna(how="all")
+    if df.empty or len(df.columns) == 0:
+        return pd.Series([], dtype=object)
 
-        for col, value in row.items():
-            # NaN, None 등은 스킵
-            if pd.isna(value):
-                continue
-            cells.append(f"{col}: {value}")
+    notna = df.notna().to_numpy()
+    columns = []
 
-        # 내용이 있는 행만 텍스트로 추가
-        if cells:
-            text = "\n".join(cells)
-            texts.append(text)
+    for i, col in enumerate(df.columns):
+        cells = (f"{col}: " + df.iloc[:, i].astype(str)).to_numpy(dtype=object)
+        cells[~notna[:, i]] = None
+        columns.append(cells)
+
+    return pd.Series(
+        [sep.join(filter(None, row)) for row in zip(*columns)],
+        index=df.index,
+        dtype=object,
+    )
 
-    return texts
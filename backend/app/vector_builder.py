@@ -4,9 +4,12 @@ from typing import List
 
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_core.documents import Document
-from langchain_community.embeddings import OllamaEmbeddings
+from langchain_ollama import OllamaEmbeddings
 from langchain_community.vectorstores import FAISS
 
+from .embedding_cache import CachedEmbeddings
+from .embedding_pipeline import embed_into_faiss
+
 # =========================
 # 경로 설정
 # =========================
@@ -19,9 +22,14 @@ VECTOR_PATH.mkdir(exist_ok=True)
 # Ollama Embeddings (전역)
 # =========================
 
-embeddings = OllamaEmbeddings(
-    model="nomic-embed-text",
-    base_url="http://localhost:11434"
+EMBED_MODEL = "nomic-embed-text"
+
+embeddings = CachedEmbeddings(
+    OllamaEmbeddings(
+        model=EMBED_MODEL,
+        base_url="http://localhost:11434"
+    ),
+    model=EMBED_MODEL,
 )
 
 # =========================
@@ -48,7 +56,7 @@ def build_vector_index(texts: List[str], sources: List[str]):
 
     print("EMBEDDINGS TYPE:", type(embeddings))
     print("📁 VECTOR INDEX DIR:", str(VECTOR_PATH))
-    db = FAISS.from_documents(chunks, embeddings)
+    db = embed_into_faiss(chunks, embeddings)
     db.save_local(str(VECTOR_PATH))
 
     print("✅ vector_index 최초 생성 완료")
@@ -68,10 +76,12 @@ def build_or_update_vector_index(texts: List[str]):
             embeddings,
             allow_dangerous_deserialization=True
         )
-        db.add_texts(texts)
     else:
         print("🆕 신규 vector_index 생성")
-        db = FAISS.from_texts(texts, embeddings)
+        db = None
+
+    docs = [Document(page_content=t) for t in texts]
+    db = embed_into_faiss(docs, embeddings, db=db)
 
     db.save_local(str(VECTOR_PATH))
     print("✅ vector_index 저장 완료")
@@ -1,22 +1,40 @@
+import os
+import threading
+from itertools import islice
 from pathlib import Path
-from langchain_community.embeddings import OllamaEmbeddings
+from typing import Iterable, Iterator
+
+import numpy as np
+from langchain_ollama import OllamaEmbeddings
 from langchain_community.vectorstores import FAISS
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_core.documents import Document
 
+from .embedding_cache import CachedEmbeddings
+from .embedding_pipeline import embed_into_faiss
+from .blocking import run_blocking
+
 # =========================
 # 경로 고정
 # =========================
 BASE_DIR = Path(__file__).resolve().parent
-INDEX_PATH = BASE_DIR / "vector_index"
+STATE_DIR = Path(os.getenv("APP_STATE_DIR", BASE_DIR))
+INDEX_PATH = STATE_DIR / "vector_index"
 INDEX_PATH.mkdir(parents=True, exist_ok=True)
 
 # =========================
 # Ollama Embeddings (OpenAI 완전 제거)
 # =========================
-embeddings = OllamaEmbeddings(
-    model="nomic-embed-text",
-    base_url="http://localhost:11434"
+EMBED_MODEL = "nomic-embed-text"
+# 벤치마크 시 fake Ollama 서버(backend/benchmarks/fake_ollama.py) 로 교체 가능
+OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+
+embeddings = CachedEmbeddings(
+    OllamaEmbeddings(
+        model=EMBED_MODEL,
+        base_url=OLLAMA_BASE_URL
+    ),
+    model=EMBED_MODEL,
 )
 
 # =========================
@@ -29,40 +47,130 @@ text_splitter = RecursiveCharacterTextSplitter(
 
 # =========================
 # Vector Index 생성
+#  - upsert=True(기본): 기존 인덱스는 유지하고, 업로드된 source 의 기존 벡터만
+#    삭제한 뒤 새 chunk 만 임베딩해서 추가
+#  - upsert=False: 업로드된 내용만으로 인덱스를 새로 만들어 덮어씀
+#  - 반환값: 추가된 chunk 수 (실패 시 None)
 # =========================
-def build_vector_store(texts: list[str], sources: list[str]):
+INGEST_WINDOW_ROWS = int(os.getenv("INGEST_WINDOW_ROWS", "512"))
+
+# 공용 인덱스 load → 삭제/병합 → save 구간 직렬화 (파싱/임베딩은 lock 밖)
+_build_lock = threading.Lock()
+
+
+def _ids_for_sources(db: FAISS, sources: set[str]) -> list[str]:
+    """docstore 에서 metadata.source 가 sources 에 속하는 문서 id 목록"""
+    ids = []
+    for doc_id in db.index_to_docstore_id.values():
+        doc = db.docstore.search(doc_id)
+        if isinstance(doc, Document) and doc.metadata.get("source") in sources:
+            ids.append(doc_id)
+    return ids
+
+
+def _split_row_documents(row_docs: list[Document]) -> list[Document]:
+    """행 문서를 chunk 로 분할 (sheet/row 등 metadata 유지)"""
+    docs: list[Document] = []
+    for row_doc in row_docs:
+        if not row_doc.page_content.strip():
+            continue
+        for c in text_splitter.split_text(row_doc.page_content):
+            docs.append(Document(page_content=c, metadata=dict(row_doc.metadata)))
+    return docs
+
+
+def build_vector_store(
+    texts: list[str],
+    sources: list[str],
+    upsert: bool = True,
+    on_progress=None,
+):
+    print("sources::::", sources)
+
+    row_docs = [
+        Document(page_content=text, metadata={"source": src})
+        for text, src in zip(texts, sources)
+    ]
+    return build_vector_store_from_documents(
+        row_docs, set(sources), upsert=upsert, on_progress=on_progress
+    )
+
+
+def build_vector_store_from_documents(
+    row_docs: Iterable[Document],
+    sources: set[str],
+    upsert: bool = True,
+    on_progress=None,
+):
+    """
+    행 문서 iterator 를 INGEST_WINDOW_ROWS 단위로 끊어서
+    분할 → 임베딩 → 인덱스 추가를 반복한다.
+    (전체 파싱이 끝나기 전에 임베딩이 시작되고, 메모리는 window 크기로 제한)
+    파싱/임베딩은 이 업로드 전용 인덱스에 하고, 공용 인덱스 병합/저장만 _build_lock 안에서 수행
+    → 여러 인제스트 job 이 동시에 파싱/임베딩할 수 있음
+    on_progress(임베딩 완료 chunk 수, 지금까지 생성된 chunk 수)
+    """
     try:
-        docs: list[Document] = []
+        fresh = None
+        embedded = 0
+        seen = 0
 
-        print("sources::::", sources)
+        def window_progress(done: int, _total: int):
+            if on_progress:
+                on_progress(embedded + done, seen)
 
-        for text, src in zip(texts, sources):
-            if not text.strip():
+        for window in _windows(row_docs, INGEST_WINDOW_ROWS):
+            docs = _split_row_documents(window)
+            if not docs:
                 continue
+            seen += len(docs)
+            fresh = embed_into_faiss(docs, embeddings, db=fresh, on_progress=window_progress)
+            embedded += len(docs)
 
-            chunks = text_splitter.split_text(text)
+        if not embedded and not upsert:
+            print("⚠️ VECTOR BUILD SKIPPED — docs empty")
+            return 0
 
-            for c in chunks:
-                docs.append(
-                    Document(
-                        page_content=c,
-                        metadata={"source": src}
-                    )
-                )
+        with _build_lock:
+            db = None
+            stale_ids = []
+            if upsert and _index_fingerprint() is not None:
+                # 캐시된 객체는 검색에 쓰이고 있으므로 디스크에서 별도 사본을 열어 수정
+                db = load_vector_store()
+                stale_ids = _ids_for_sources(db, sources)
+                if stale_ids:
+                    db.delete(stale_ids)
+                print(f"🔁 VECTOR UPSERT — 기존 {len(stale_ids)}건 삭제")
 
-        if not docs:
-            print("⚠️ VECTOR BUILD SKIPPED — docs empty")
-            return
+            if fresh is None:
+                # 새 행이 없어도 같은 source 의 이전 벡터는 삭제해서 저장
+                if not stale_ids:
+                    print("⚠️ VECTOR BUILD SKIPPED — docs empty")
+                    return 0
+            elif db is None:
+                db = fresh
+            else:
+                db.merge_from(fresh)
 
-        print("VECTOR DOC COUNT:", len(docs))
-        print("EMBEDDINGS TYPE:", type(embeddings))
-        db = FAISS.from_documents(docs, embeddings)
-        db.save_local(str(INDEX_PATH))
+            print("VECTOR DOC COUNT:", embedded)
+            db.save_local(str(INDEX_PATH))
+            invalidate_vector_cache()
 
         print("✅ VECTOR INDEX BUILD COMPLETE")
+        return embedded
 
     except Exception as e:
         print("❌ VECTOR BUILD ERROR =>", e)
+        return None
+
+
+def _windows(items: Iterable, size: int) -> Iterator[list]:
+    it = iter(items)
+    while True:
+        window = list(islice(it, size))
+        if not window:
+            return
+        yield window
 
 
 # =========================
@@ -78,3 +186,130 @@ def load_vector_store():
         embeddings,
         allow_dangerous_deserialization=True
     )
+
+
+# =========================
+# 프로세스 공용 Vector Index 캐시
+#  - 요청마다 index.pkl / index.faiss 를 다시 읽지 않도록 메모리에 상주
+#  - generation(프로세스 내 재빌드) 또는 파일 fingerprint(외부 스크립트 재빌드)가
+#    바뀐 경우에만 재로드
+# =========================
+_cache_lock = threading.Lock()
+_cached_db = None
+_cached_key = None
+_generation = 0
+_cache_stats = {"hits": 0, "reloads": 0, "misses": 0}
+
+
+def _index_fingerprint():
+    """index.faiss / index.pkl 의 (mtime_ns, size). 인덱스가 없으면 None"""
+    try:
+        return tuple(
+            (st.st_mtime_ns, st.st_size)
+            for st in (
+                (INDEX_PATH / "index.faiss").stat(),
+                (INDEX_PATH / "index.pkl").stat(),
+            )
+        )
+    except FileNotFoundError:
+        return None
+
+
+def invalidate_vector_cache():
+    """인덱스를 다시 저장한 쪽에서 호출 → 다음 조회 때 재로드"""
+    global _generation
+    with _cache_lock:
+        _generation += 1
+
+
+def get_vector_store():
+    """
+    /search, vector fallback 에서 사용하는 공용 retriever.
+    디스크 인덱스가 바뀌지 않았다면 메모리의 FAISS 객체를 그대로 반환한다.
+    """
+    global _cached_db, _cached_key
+
+    fingerprint = _index_fingerprint()
+    if fingerprint is None:
+        with _cache_lock:
+            _cache_stats["misses"] += 1
+            _cached_db = None
+            _cached_key = None
+        return None
+
+    with _cache_lock:
+        key = (_generation, fingerprint)
+        if _cached_db is not None and _cached_key == key:
+            _cache_stats["hits"] += 1
+            return _cached_db
+
+        db = load_vector_store()
+        _cached_db = db
+        _cached_key = key
+        _cache_stats["reloads"] += 1
+        print("🔁 VECTOR INDEX (RE)LOADED, generation =", _generation)
+        return db
+
+
+def index_version():
+    """인덱스 변경 감지용 (generation, fingerprint) — 답변 캐시 무효화 등에 사용"""
+    with _cache_lock:
+        generation = _generation
+    return generation, _index_fingerprint()
+
+
+def vector_cache_stats() -> dict:
+    with _cache_lock:
+        return {
+            **_cache_stats,
+            "generation": _generation,
+            "loaded": _cached_db is not None,
+        }
+
+
+# =========================
+# async 진입점 (이벤트 루프에서 호출 → blocking pool 에서 실행)
+# =========================
+def similarity_search(question: str, k: int = 4):
+    """인덱스가 없으면 None"""
+    db = get_vector_store()
+    if not db:
+        return None
+    return db.similarity_search(question, k=k)
+
+
+def batch_similarity_search(questions: list[str], k: int = 4):
+    """
+    질문 여러 개를 한 번에 임베딩하고 FAISS index.search 한 번으로 검색.
+    반환: (질문 벡터 목록, 질문별 Document 목록 | 인덱스가 없으면 None)
+    질문 벡터는 답변 캐시 조회에 그대로 재사용한다.
+    """
+    query_vectors = embeddings.embed_queries(questions)
+    db = get_vector_store()
+    if not db:
+        return query_vectors, None
+
+    vectors = np.asarray(query_vectors, dtype=np.float32)
+    if getattr(db, "_normalize_L2", False):
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-12
+
+    _, indices = db.index.search(vectors, k)
+    results = []
+    for row in indices:
+        docs = []
+        for i in row:
+            if i == -1:
+                continue
+            doc = db.docstore.search(db.index_to_docstore_id[i])
+            if isinstance(doc, Document):
+                docs.append(doc)
+        results.append(docs)
+    return query_vectors, results
+
+
+async def asimilarity_search(question: str, k: int = 4):
+    return await run_blocking(similarity_search, question, k)
+
+
+async def abatch_similarity_search(questions: list[str], k: int = 4):
+    return await run_blocking(batch_similarity_search, questions, k)
@@ -0,0 +1,265 @@
+# backend/benchmarks/bench_e2e.py
+#
+# 실제 Ollama 없이 end-to-end 지연 시간 측정
+#
+#   1) python -m backend.benchmarks.fake_ollama --port 11435 --tokens-per-sec 40
+#   2) APP_STATE_DIR=$(mktemp -d) OLLAMA_BASE_URL=http://localhost:11435 \
+#        uvicorn backend.app.main:app --port 8000
+#   3) python -m backend.benchmarks.bench_e2e --scenario invoke search --concurrency 4 --requests 40
+#
+# APP_STATE_DIR 로 임베딩 캐시 / HR 표 DB / 체크포인트 / FAISS 인덱스 / 업로드 파일을
+# 임시 디렉터리에 두므로 fake 벡터나 업로드 시나리오 데이터가 실제 상태에 섞이지 않는다.
+#
+# 결과는 --out (기본 backend/benchmarks/results/<commit>-<시각>.json) 에 저장되며
+# --compare 이전.json 이후.json 으로 두 결과를 비교할 수 있다.
+# 기준 결과: backend/benchmarks/baseline_e2e.json
+#   (fake_ollama --first-token-ms 100 --tokens-per-sec 200 --answer-tokens 40,
+#    --scenario upload invoke search --concurrency 4 --requests 16 --uploads 1, 200행 HR csv)
+
+import argparse
+import json
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import requests
+
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+DEFAULT_QUESTIONS = [
+    "연차는 며칠까지 쓸 수 있어?",
+    "재택근무 규정 알려줘",
+    "TALENT 프로젝트 진행 상황 알려줘",
+    "직무별 인원 분포 알려줘",
+    "경조사 휴가 기준이 뭐야?",
+    "보안 서약 관련 규정을 알려줘",
+    "이번 분기 일정 리스크가 큰 프로젝트는?",
+    "역량 기반 평가 기준을 정리해줘",
+]
+
+
+def _percentile(values: list, q: float):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * q))], 3)
+
+
+def _summary(latencies: list, elapsed: float, errors: int, statuses: dict) -> dict:
+    return {
+        "requests": len(latencies) + errors,
+        "ok": len(latencies),
+        "errors": errors,
+        "statuses": statuses,
+        "p50": _percentile(latencies, 0.50),
+        "p95": _percentile(latencies, 0.95),
+        "p99": _percentile(latencies, 0.99),
+        "mean": round(sum(latencies) / len(latencies), 3) if latencies else None,
+        "elapsed": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 3) if elapsed else None,
+    }
+
+
+def _fake_stats(fake_url: str):
+    if not fake_url:
+        return None
+    try:
+        return requests.get(f"{fake_url}/_stats", timeout=5).json()
+    except requests.RequestException:
+        return None
+
+
+def run_load(name: str, n_requests: int, concurrency: int, send) -> dict:
+    """send(i) -> (성공 여부, HTTP 상태) 를 concurrency 개 스레드로 n_requests 번 실행"""
+    latencies = []
+    errors = 0
+    statuses: dict = {}
+    lock = threading.Lock()
+
+    def one(i: int):
+        nonlocal errors
+        started = time.perf_counter()
+        try:
+            ok, status = send(i)
+        except requests.RequestException as e:
+            ok, status = False, type(e).__name__
+        elapsed = time.perf_counter() - started
+        with lock:
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+            if ok:
+                latencies.append(elapsed)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(n_requests)))
+    result = _summary(latencies, time.perf_counter() - started, errors, statuses)
+
+    print(
+        f"{name:>8} | n={result['requests']:<4} ok={result['ok']:<4} "
+        f"p50={result['p50']}s p95={result['p95']}s p99={result['p99']}s "
+        f"{result['throughput_rps']} req/s"
+    )
+    return result
+
+
+# =========================
+# 시나리오
+# =========================
+def scenario_invoke(args, run_id: str) -> dict:
+    def send(i: int):
+        question = args.questions[i % len(args.questions)]
+        if not args.repeat_questions:
+            # 답변 캐시 hit 을 피하기 위해 질문마다 번호를 붙임
+            question = f"{question} ({run_id}-{i})"
+        resp = requests.post(
+            f"{args.api}/graph/invoke",
+            json={"question": question, "thread_id": f"bench-{run_id}-{i}"},
+            timeout=args.timeout,
+        )
+        return resp.status_code == 200, resp.status_code
+
+    before = _fake_stats(args.fake_ollama)
+    result = run_load("invoke", args.requests, args.concurrency, send)
+    after = _fake_stats(args.fake_ollama)
+
+    if before and after and result["requests"]:
+        result["llm_calls_per_question"] = round(
+            (after["chat"] - before["chat"]) / result["requests"], 3
+        )
+        result["embed_calls_per_question"] = round(
+            (after["embeddings"] - before["embeddings"]) / result["requests"], 3
+        )
+    return result
+
+
+def scenario_search(args, run_id: str) -> dict:
+    def send(i: int):
+        resp = requests.get(
+            f"{args.api}/search",
+            params={"question": args.questions[i % len(args.questions)]},
+            timeout=args.timeout,
+        )
+        return resp.status_code == 200, resp.status_code
+
+    return run_load("search", args.requests, args.concurrency, send)
+
+
+def scenario_upload(args, run_id: str) -> dict:
+    """업로드 수락 ~ 인제스트 job 완료까지를 한 요청으로 측정"""
+    if not args.upload_file:
+        raise SystemExit("upload 시나리오는 --upload-file 이 필요합니다.")
+    path = Path(args.upload_file)
+
+    def send(i: int):
+        with open(path, "rb") as f:
+            resp = requests.post(
+                f"{args.api}/projects/bench/upload-report",
+                files={"file": (f"bench-{run_id}-{i}{path.suffix}", f)},
+                timeout=args.timeout,
+            )
+        if resp.status_code != 200:
+            return False, resp.status_code
+
+        job_id = resp.json()["job_id"]
+        deadline = time.time() + args.timeout
+        while time.time() < deadline:
+            job = requests.get(f"{args.api}/jobs/{job_id}", timeout=10).json()
+            if job["status"] in ("done", "failed"):
+                return job["status"] == "done", job["status"]
+            time.sleep(0.2)
+        return False, "timeout"
+
+    return run_load("upload", args.uploads, min(args.concurrency, args.uploads), send)
+
+
+SCENARIOS = {
+    "invoke": scenario_invoke,
+    "search": scenario_search,
+    "upload": scenario_upload,
+}
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(before_path: str, after_path: str):
+    before = json.loads(Path(before_path).read_text(encoding="utf-8"))
+    after = json.loads(Path(after_path).read_text(encoding="utf-8"))
+    print(f"{before['commit']} → {after['commit']}")
+    for name, b in before["results"].items():
+        a = after["results"].get(name)
+        if not a:
+            continue
+        for metric in ("p50", "p95", "p99", "throughput_rps", "llm_calls_per_question"):
+            if b.get(metric) is None or a.get(metric) is None:
+                continue
+            change = (a[metric] - b[metric]) / b[metric] * 100 if b[metric] else 0.0
+            print(f"{name:>8} {metric:>24}: {b[metric]:>9} → {a[metric]:>9} ({change:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--api", default="http://localhost:8000")
+    parser.add_argument("--fake-ollama", default="http://localhost:11435",
+                        help="fake_ollama 주소 (LLM 호출 수 집계용, 비우면 생략)")
+    parser.add_argument("--scenario", nargs="+", choices=list(SCENARIOS), default=["invoke", "search"])
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--uploads", type=int, default=2)
+    parser.add_argument("--upload-file", help="upload 시나리오에 사용할 xlsx/csv")
+    parser.add_argument("--questions-file", help="한 줄에 질문 하나")
+    parser.add_argument("--repeat-questions", action="store_true",
+                        help="질문에 번호를 붙이지 않음 (답변 캐시 hit 포함 측정)")
+    parser.add_argument("--timeout", type=float, default=420)
+    parser.add_argument("--label", default="")
+    parser.add_argument("--out")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"))
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    args.questions = DEFAULT_QUESTIONS
+    if args.questions_file:
+        lines = Path(args.questions_file).read_text(encoding="utf-8").splitlines()
+        args.questions = [q.strip() for q in lines if q.strip()]
+
+    commit = _git_commit()
+    run_id = datetime.now().strftime("%Y%m%d-%H%M%S")
+    results = {name: SCENARIOS[name](args, run_id) for name in args.scenario}
+
+    report = {
+        "commit": commit,
+        "label": args.label,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "config": {
+            "api": args.api,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "uploads": args.uploads,
+            "repeat_questions": args.repeat_questions,
+        },
+        "results": results,
+    }
+
+    out = Path(args.out) if args.out else RESULTS_DIR / f"{commit}-{run_id}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"saved → {out}")
+
+
+if __name__ == "__main__":
+    main()
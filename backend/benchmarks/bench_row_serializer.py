@@ -0,0 +1,82 @@
+# backend/benchmarks/bench_row_serializer.py
+#
+# 실행: python -m backend.benchmarks.bench_row_serializer [--rows 1000 100000 1000000]
+#
+# iterrows 기반(기존) 행 직렬화와 serialize_rows(컬럼 단위) 를 비교한다.
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from backend.app.text_extract import serialize_rows
+
+
+# =========================
+# 샘플 HR 데이터
+# =========================
+def make_hr_frame(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    roles = np.array(["Backend", "Frontend", "Data", "HR", "PM", "QA"])
+    depts = np.array(["개발1팀", "개발2팀", "인사팀", "기획팀"])
+
+    df = pd.DataFrame({
+        "emp_id": np.arange(n_rows),
+        "name": [f"직원{i}" for i in range(n_rows)],
+        "role": roles[rng.integers(0, len(roles), n_rows)],
+        "dept": depts[rng.integers(0, len(depts), n_rows)],
+        "years": rng.integers(0, 20, n_rows),
+        "score": rng.random(n_rows).round(2),
+    })
+    # 약 10% 셀을 결측 처리
+    for col in ("dept", "score"):
+        df.loc[rng.random(n_rows) < 0.1, col] = None
+    return df
+
+
+def legacy_serialize(df: pd.DataFrame) -> list[str]:
+    """기존 convert_df_to_texts 구현 (비교용)"""
+    df = df.dropna(how="all")
+    texts = []
+    for _, row in df.iterrows():
+        cells = [f"{col}: {value}" for col, value in row.items() if not pd.isna(value)]
+        if cells:
+            texts.append("\n".join(cells))
+    return texts
+
+
+def _timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - started, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    parser.add_argument(
+        "--legacy-max-rows",
+        type=int,
+        default=100_000,
+        help="이 행 수를 넘으면 iterrows 측정은 생략 (1M 행은 수 분 소요)",
+    )
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} | {'iterrows(s)':>12} | {'serialize_rows(s)':>18} | {'speedup':>8}")
+    print("-" * 58)
+
+    for n in args.rows:
+        df = make_hr_frame(n)
+        fast_s, fast = _timed(lambda d: serialize_rows(d).tolist(), df)
+
+        if n <= args.legacy_max_rows:
+            legacy_s, legacy = _timed(legacy_serialize, df)
+            assert len(legacy) == len(fast)
+            print(f"{n:>10,} | {legacy_s:>12.3f} | {fast_s:>18.3f} | {legacy_s / fast_s:>7.1f}x")
+        else:
+            print(f"{n:>10,} | {'skipped':>12} | {fast_s:>18.3f} | {'-':>8}")
+
+
+if __name__ == "__main__":
+    main()
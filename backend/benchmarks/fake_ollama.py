@@ -0,0 +1,228 @@
+# backend/benchmarks/fake_ollama.py
+#
+# 실행: python -m backend.benchmarks.fake_ollama [--port 11435] [--tokens-per-sec 40] [--script rules.json]
+#
+# 실제 Ollama / 모델 없이 graph.py, main.py 의 지연 시간을 측정하기 위한 대역 서버.
+# Ollama HTTP API 중 앱이 사용하는 부분만 흉내낸다.
+#   - POST /api/chat        : 스트리밍(NDJSON) / 비스트리밍, 스크립트 기반 tool_calls
+#   - POST /api/embeddings  : 구버전 API (prompt 1개)
+#   - POST /api/embed       : langchain_ollama OllamaEmbeddings (input 여러 개)
+#   - GET  /_stats          : 호출 수 (벤치마크가 질문당 LLM 호출 수 계산에 사용)
+#
+# 앱은 OLLAMA_BASE_URL=http://localhost:11435 로 실행하면 이 서버를 사용한다.
+#
+# --script 파일 형식 (tools 가 붙은 agent 요청에서 마지막 사용자 메시지에 정규식 매칭):
+# [
+#   {"pattern": "프로젝트", "tool_calls": [{"name": "analyze_project_status",
+#                                          "arguments": {"project_name": "TALENT"}}]},
+#   {"pattern": "규정|연차", "tool_calls": [{"name": "search_docs", "arguments": {"query": "연차"}}]}
+# ]
+
+import argparse
+import asyncio
+import hashlib
+import json
+import re
+import threading
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+
+# =========================
+# 설정 (main 에서 CLI 인자로 채움)
+# =========================
+config = {
+    "first_token_ms": 300.0,
+    "tokens_per_sec": 40.0,
+    "answer_tokens": 120,
+    "embed_ms": 20.0,
+    "embed_dim": 768,
+    "script": [],
+    # 이 문구가 마지막 사용자 메시지에 있으면 tool_calls 대신 답변 생성 (summarize 단계)
+    "no_tool_pattern": "최종 답변을 작성",
+}
+
+_stats_lock = threading.Lock()
+_stats = {"chat": 0, "chat_tool_calls": 0, "embeddings": 0, "embedded_texts": 0}
+
+app = FastAPI(title="fake-ollama")
+
+
+def _count(**fields):
+    with _stats_lock:
+        for k, v in fields.items():
+            _stats[k] += v
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+# =========================
+# 임베딩
+#  - 단어 hashing → 고정 차원 벡터 (같은 단어를 공유하는 텍스트끼리 유사도가 높음)
+#  - 입력이 같으면 항상 같은 벡터
+# =========================
+_WORD = re.compile(r"[0-9A-Za-z가-힣]+")
+
+
+def fake_embedding(text: str) -> list[float]:
+    dim = config["embed_dim"]
+    vec = np.zeros(dim, dtype=np.float32)
+    for word in _WORD.findall(text.lower()) or [text]:
+        h = int.from_bytes(hashlib.sha256(word.encode("utf-8")).digest()[:8], "little")
+        vec[h % dim] += 1.0 if (h >> 32) & 1 else -1.0
+    norm = np.linalg.norm(vec)
+    return (vec / norm if norm else vec).tolist()
+
+
+@app.post("/api/embeddings")
+async def embeddings(request: Request):
+    body = await request.json()
+    await asyncio.sleep(config["embed_ms"] / 1000)
+    _count(embeddings=1, embedded_texts=1)
+    return {"embedding": fake_embedding(body.get("prompt", ""))}
+
+
+@app.post("/api/embed")
+async def embed(request: Request):
+    body = await request.json()
+    inputs = body.get("input", "")
+    if isinstance(inputs, str):
+        inputs = [inputs]
+    await asyncio.sleep(config["embed_ms"] / 1000)
+    _count(embeddings=1, embedded_texts=len(inputs))
+    return {"model": body.get("model"), "embeddings": [fake_embedding(t) for t in inputs]}
+
+
+# =========================
+# Chat
+# =========================
+def _scripted_tool_calls(body: dict):
+    """tools 가 붙은 agent 요청이고 스크립트 규칙이 맞으면 tool_calls 반환"""
+    if not body.get("tools") or not config["script"]:
+        return None
+
+    messages = body.get("messages", [])
+    if not messages or messages[-1].get("role") != "user":
+        return None
+
+    content = messages[-1].get("content") or ""
+    if re.search(config["no_tool_pattern"], content):
+        return None
+
+    offered = {t.get("function", {}).get("name") for t in body["tools"]}
+    for rule in config["script"]:
+        if re.search(rule["pattern"], content):
+            calls = [c for c in rule["tool_calls"] if c["name"] in offered]
+            if calls:
+                return [
+                    {"function": {"name": c["name"], "arguments": c.get("arguments", {})}}
+                    for c in calls
+                ]
+    return None
+
+
+def _final_chunk(model: str, n_tokens: int, started: float) -> dict:
+    return {
+        "model": model,
+        "created_at": _now(),
+        "message": {"role": "assistant", "content": ""},
+        "done": True,
+        "done_reason": "stop",
+        "total_duration": int((time.perf_counter() - started) * 1e9),
+        "prompt_eval_count": 0,
+        "eval_count": n_tokens,
+    }
+
+
+@app.post("/api/chat")
+async def chat(request: Request):
+    body = await request.json()
+    model = body.get("model", "fake")
+    stream = body.get("stream", True)
+    started = time.perf_counter()
+    tool_calls = _scripted_tool_calls(body)
+    _count(chat=1, chat_tool_calls=1 if tool_calls else 0)
+
+    n_tokens = 0 if tool_calls else config["answer_tokens"]
+    token_delay = 1.0 / config["tokens_per_sec"] if config["tokens_per_sec"] > 0 else 0.0
+
+    if not stream:
+        await asyncio.sleep(config["first_token_ms"] / 1000 + n_tokens * token_delay)
+        message = {"role": "assistant", "content": "".join(f"토큰{i} " for i in range(n_tokens))}
+        if tool_calls:
+            message["tool_calls"] = tool_calls
+        return {**_final_chunk(model, n_tokens, started), "message": message}
+
+    async def generate():
+        await asyncio.sleep(config["first_token_ms"] / 1000)
+        if tool_calls:
+            yield json.dumps({
+                "model": model,
+                "created_at": _now(),
+                "message": {"role": "assistant", "content": "", "tool_calls": tool_calls},
+                "done": False,
+            }, ensure_ascii=False) + "\n"
+        for i in range(n_tokens):
+            yield json.dumps({
+                "model": model,
+                "created_at": _now(),
+                "message": {"role": "assistant", "content": f"토큰{i} "},
+                "done": False,
+            }, ensure_ascii=False) + "\n"
+            await asyncio.sleep(token_delay)
+        yield json.dumps(_final_chunk(model, n_tokens, started)) + "\n"
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
+@app.get("/api/version")
+async def version():
+    return {"version": "0.0.0-fake"}
+
+
+@app.get("/api/tags")
+async def tags():
+    return {"models": [{"name": "qwen2.5:3b"}, {"name": "nomic-embed-text"}]}
+
+
+@app.get("/_stats")
+async def stats():
+    with _stats_lock:
+        return dict(_stats)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--first-token-ms", type=float, default=config["first_token_ms"])
+    parser.add_argument("--tokens-per-sec", type=float, default=config["tokens_per_sec"])
+    parser.add_argument("--answer-tokens", type=int, default=config["answer_tokens"])
+    parser.add_argument("--embed-ms", type=float, default=config["embed_ms"])
+    parser.add_argument("--embed-dim", type=int, default=config["embed_dim"])
+    parser.add_argument("--script", help="tool_calls 규칙 JSON 파일")
+    args = parser.parse_args()
+
+    config.update(
+        first_token_ms=args.first_token_ms,
+        tokens_per_sec=args.tokens_per_sec,
+        answer_tokens=args.answer_tokens,
+        embed_ms=args.embed_ms,
+        embed_dim=args.embed_dim,
+    )
+    if args.script:
+        with open(args.script, encoding="utf-8") as f:
+            config["script"] = json.load(f)
+
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+# backend/tests/test_answer_cache_scope.py
+#
+# 답변 캐시는 이전 대화가 없는 thread 의 첫 질문에만 사용
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from backend.app import main
+
+
+class _StubGraph:
+    def __init__(self, messages):
+        self.messages = messages
+
+    async def aget_state(self, config):
+        return SimpleNamespace(values={"messages": self.messages})
+
+
+@pytest.fixture
+def lookups(monkeypatch):
+    calls = []
+
+    async def fake_alookup(question, vector=None):
+        calls.append(question)
+        return {"question": question, "answer": "cached"}, [1.0]
+
+    monkeypatch.setattr(main.answer_cache, "alookup", fake_alookup)
+    return calls
+
+
+def test_first_turn_uses_answer_cache(monkeypatch, lookups):
+    monkeypatch.setattr(main, "graph", _StubGraph([]))
+
+    cached, vector = asyncio.run(main._answer_cache_lookup("연차 규정", {}))
+
+    assert cached["answer"] == "cached"
+    assert lookups == ["연차 규정"]
+
+
+def test_follow_up_turn_skips_answer_cache(monkeypatch, lookups):
+    history = [HumanMessage(content="연차 규정"), AIMessage(content="15일")]
+    monkeypatch.setattr(main, "graph", _StubGraph(history))
+
+    cached, vector = asyncio.run(main._answer_cache_lookup("더 자세히 알려줘", {}))
+
+    # 벡터가 None 이므로 이 턴의 답변도 캐시에 저장되지 않음
+    assert (cached, vector) == (None, None)
+    assert lookups == []
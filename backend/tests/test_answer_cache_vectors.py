@@ -0,0 +1,35 @@
+# backend/tests/test_answer_cache_vectors.py
+#
+# batch 엔드포인트가 넘긴 질문 벡터를 답변 캐시가 재임베딩 없이 사용
+
+import pytest
+
+pytest.importorskip("langchain_community")
+
+from backend.app import answer_cache
+
+
+class _NoEmbeddings:
+    def embed_query(self, text):
+        raise AssertionError("precomputed vector should be used")
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(monkeypatch):
+    monkeypatch.setattr(answer_cache, "embeddings", _NoEmbeddings())
+    monkeypatch.setattr(answer_cache, "_data_version", lambda: "v1")
+    answer_cache.clear()
+    yield
+    answer_cache.clear()
+
+
+def test_lookup_uses_precomputed_vector():
+    cached, vector = answer_cache.lookup("연차 규정", vector=[3.0, 4.0])
+
+    assert cached is None
+    assert vector.tolist() == pytest.approx([0.6, 0.8])
+
+    answer_cache.store("연차 규정", vector, {"answer": "15일", "sources": []})
+    cached, _ = answer_cache.lookup("연차 규정은?", vector=[0.6, 0.8])
+
+    assert cached["answer"] == "15일"
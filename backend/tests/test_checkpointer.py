@@ -0,0 +1,63 @@
+# backend/tests/test_checkpointer.py
+#
+# 실행: python -m pytest backend/tests
+#
+# hot thread 캐시가 쓰기와 겹친 조회 결과(이전 checkpoint)를 캐시하지 않는지
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("langgraph.checkpoint.sqlite")
+
+import aiosqlite
+from langgraph.checkpoint.base import empty_checkpoint
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+from backend.app.checkpointer import BoundedSqliteSaver
+
+
+CONFIG = {"configurable": {"thread_id": "t1", "checkpoint_ns": ""}}
+
+
+def _checkpoint(checkpoint_id: str) -> dict:
+    checkpoint = empty_checkpoint()
+    checkpoint["id"] = checkpoint_id
+    return checkpoint
+
+
+def test_concurrent_read_does_not_cache_stale_checkpoint(tmp_path, monkeypatch):
+    async def run():
+        conn = await aiosqlite.connect(str(tmp_path / "checkpoints.db"))
+        saver = BoundedSqliteSaver(conn)
+        await saver.setup()
+        await saver.aput(CONFIG, _checkpoint("1"), {}, {})
+
+        # 첫 조회는 이전 row 를 읽은 뒤 쓰기가 끝날 때까지 멈춤
+        read_done = asyncio.Event()
+        release = asyncio.Event()
+        original = AsyncSqliteSaver.aget_tuple
+
+        async def slow_aget_tuple(self, config):
+            result = await original(self, config)
+            if not read_done.is_set():
+                read_done.set()
+                await release.wait()
+            return result
+
+        monkeypatch.setattr(AsyncSqliteSaver, "aget_tuple", slow_aget_tuple)
+
+        reader = asyncio.create_task(saver.aget_tuple(CONFIG))
+        await read_done.wait()
+        await saver.aput(CONFIG, _checkpoint("2"), {}, {})
+        release.set()
+        stale = await reader
+
+        latest = await saver.aget_tuple(CONFIG)
+        await conn.close()
+        return stale, latest
+
+    stale, latest = asyncio.run(run())
+
+    assert stale.checkpoint["id"] == "1"
+    assert latest.checkpoint["id"] == "2"
@@ -0,0 +1,74 @@
+# backend/tests/test_embedding_cache.py
+#
+# 실행: python -m pytest backend/tests
+#
+# CachedEmbeddings 가 Ollama 에 보내는 요청 수 / instruction prefix
+
+import asyncio
+
+import pytest
+
+from backend.app import embedding_cache
+from backend.app.embedding_cache import CachedEmbeddings
+
+
+class _CountingEmbeddings:
+    base_url = "http://fake:11434"
+
+    def __init__(self):
+        self.calls = []
+
+    def embed_documents(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(t)), 1.0] for t in texts]
+
+    def embed_query(self, text):
+        raise AssertionError("embed_query 는 요청을 하나씩 보내므로 사용하지 않음")
+
+
+@pytest.fixture
+def cached(tmp_path, monkeypatch):
+    monkeypatch.setattr(embedding_cache, "CACHE_FILE", tmp_path / "embedding_cache.db")
+    inner = _CountingEmbeddings()
+    return inner, CachedEmbeddings(inner, model="nomic-embed-text")
+
+
+def test_embed_queries_sends_one_request(cached):
+    inner, emb = cached
+
+    vectors = emb.embed_queries(["연차", "재택", "연차"])
+
+    assert inner.calls == [["query: 연차", "query: 재택"]]
+    assert vectors[0] == vectors[2]
+    assert len(vectors) == 3
+
+
+def test_embed_documents_sends_only_misses(cached):
+    inner, emb = cached
+
+    emb.embed_documents(["a", "b"])
+    emb.embed_documents(["a", "b", "c", "c"])
+
+    assert inner.calls == [["passage: a", "passage: b"], ["passage: c"]]
+    assert emb.model == "nomic-embed-text@http://fake:11434"
+
+
+class _AsyncCountingEmbeddings(_CountingEmbeddings):
+    def embed_documents(self, texts):
+        raise AssertionError("인제스트 경로는 async 클라이언트를 사용해야 함")
+
+    async def aembed_documents(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(t)), 1.0] for t in texts]
+
+
+def test_aembed_documents_batches_misses(tmp_path, monkeypatch):
+    monkeypatch.setattr(embedding_cache, "CACHE_FILE", tmp_path / "embedding_cache.db")
+    inner = _AsyncCountingEmbeddings()
+    emb = CachedEmbeddings(inner, model="nomic-embed-text")
+
+    first = asyncio.run(emb.aembed_documents(["a", "b", "a"]))
+    second = asyncio.run(emb.aembed_documents(["a", "b", "c"]))
+
+    assert inner.calls == [["passage: a", "passage: b"], ["passage: c"]]
+    assert first[0] == first[2] == second[0]
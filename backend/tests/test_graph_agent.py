@@ -0,0 +1,135 @@
+# backend/tests/test_graph_agent.py
+#
+# 실행: python -m pytest backend/tests
+#
+# agent_node 의 speculative retrieval 경로 (LLM / 검색은 가짜로 대체)
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("langgraph")
+pytest.importorskip("langchain_ollama")
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from backend.app import graph
+
+
+@pytest.fixture
+def fake_retrieval(monkeypatch):
+    calls = {"vector": 0, "keyword": 0}
+
+    def fake_vector(question):
+        calls["vector"] += 1
+        return [{"source": "hr.xlsx", "content": f"vector:{question}"}]
+
+    async def fake_keyword(question):
+        calls["keyword"] += 1
+        return [{"source": "policy.txt", "content": f"keyword:{question}"}]
+
+    monkeypatch.setattr(graph, "SPECULATIVE_RETRIEVAL", True)
+    monkeypatch.setattr(graph, "_vector_fallback_docs", fake_vector)
+    monkeypatch.setattr(graph, "keyword_docs", fake_keyword)
+    return calls
+
+
+def _fake_llm(monkeypatch, response: AIMessage):
+    async def fake_call_llm(llm, messages):
+        return response
+
+    monkeypatch.setattr(graph, "call_llm", fake_call_llm)
+
+
+def test_agent_node_speculative_prefetch(monkeypatch, fake_retrieval):
+    _fake_llm(monkeypatch, AIMessage(content="답변"))
+
+    state = {"messages": [HumanMessage(content="연차 규정")]}
+    update = asyncio.run(graph.agent_node(state))
+
+    assert update["messages"][0].content == "답변"
+    assert update["prefetched"] == {
+        "question": "연차 규정",
+        "vector": [{"source": "hr.xlsx", "content": "vector:연차 규정"}],
+        "keyword": [{"source": "policy.txt", "content": "keyword:연차 규정"}],
+    }
+    assert fake_retrieval == {"vector": 1, "keyword": 1}
+
+
+def test_agent_node_skips_search_when_prefetched(monkeypatch, fake_retrieval):
+    _fake_llm(monkeypatch, AIMessage(content="답변"))
+
+    prefetched = {"question": "연차 규정", "vector": [], "keyword": []}
+    state = {"messages": [HumanMessage(content="연차 규정")], "prefetched": prefetched}
+    update = asyncio.run(graph.agent_node(state))
+
+    assert "prefetched" not in update
+    assert fake_retrieval == {"vector": 0, "keyword": 0}
+
+
+def test_agent_node_cancels_search_on_tool_calls(monkeypatch):
+    started = asyncio.Event()
+    cancelled = []
+
+    async def slow_keyword(question):
+        started.set()
+        try:
+            await asyncio.sleep(30)
+        except asyncio.CancelledError:
+            cancelled.append(question)
+            raise
+        return []
+
+    async def fake_call_llm(llm, messages):
+        await started.wait()
+        return AIMessage(
+            content="",
+            tool_calls=[{"name": "search_docs", "args": {"query": "연차"}, "id": "call_1"}],
+        )
+
+    async def run():
+        update = await asyncio.wait_for(graph.agent_node(state), timeout=5)
+        await asyncio.sleep(0)
+        return update
+
+    monkeypatch.setattr(graph, "SPECULATIVE_RETRIEVAL", True)
+    monkeypatch.setattr(graph, "_vector_fallback_docs", lambda question: [])
+    monkeypatch.setattr(graph, "keyword_docs", slow_keyword)
+    monkeypatch.setattr(graph, "call_llm", fake_call_llm)
+
+    state = {"messages": [HumanMessage(content="연차 규정")]}
+    update = asyncio.run(run())
+
+    assert update["messages"][0].tool_calls[0]["name"] == "search_docs"
+    assert "prefetched" not in update
+    assert cancelled == ["연차 규정"]
+
+
+def test_keyword_docs_searches_extracted_terms(tmp_path, monkeypatch):
+    from backend.app import project_config
+
+    (tmp_path / "remote.txt").write_text(
+        "# 재택근무 규정\n재택근무는 주 2회까지 신청할 수 있다.\n", encoding="utf-8"
+    )
+    monkeypatch.setattr(project_config, "DATA_DIR", tmp_path)
+    project_config.load_docs.cache_clear()
+
+    docs = asyncio.run(graph.keyword_docs("재택근무는 일주일에 몇 번 가능한가요?"))
+    project_config.load_docs.cache_clear()
+
+    assert [d["source"] for d in docs] == ["remote.txt"]
+
+
+def test_keyword_docs_skips_search_without_terms(monkeypatch):
+    queries = []
+
+    class _FakeTool:
+        async def coroutine(self, query):
+            queries.append(query)
+            return "", {"documents": []}
+
+    monkeypatch.setattr(graph, "search_docs", _FakeTool())
+
+    assert asyncio.run(graph.keyword_docs("?")) == []
+    asyncio.run(graph.keyword_docs("연차는 며칠까지 쓸 수 있어?"))
+    assert queries == ["연차 며칠까지"]
@@ -0,0 +1,63 @@
+# backend/tests/test_hr_db.py
+#
+# 실행: python -m pytest backend/tests
+#
+# HR 표 적재 시 컬럼 타입 선언 / 필터가 인덱스를 타는지
+
+import pytest
+
+from backend.app import hr_db
+
+
+@pytest.fixture
+def loaded(tmp_path, monkeypatch):
+    monkeypatch.setattr(hr_db, "HR_DB_FILE", tmp_path / "hr_tables.db")
+
+    loader = hr_db.HrTableLoader("hr.xlsx")
+    header = ["emp_id", "role", "years", "score", "memo"]
+    loader.add_row("Sheet1", header, [1, "Backend", 3, 0.5, None])
+    loader.add_row("Sheet1", header, [2, "Backend", 5, 1, "휴직"])
+    loader.add_row("Sheet1", header, [3, "QA", 5, 0.75, None])
+    loader.finish()
+    return hr_db.list_tables()[0]
+
+
+def test_columns_declared_with_seen_types(loaded):
+    conn = hr_db.get_conn()
+    declared = {
+        name: type_name
+        for _, name, type_name, *_ in conn.execute(f"PRAGMA table_info({loaded['table_name']})")
+    }
+    staging = conn.execute(
+        "SELECT COUNT(*) FROM sqlite_master WHERE name LIKE '%_staging'"
+    ).fetchone()[0]
+    conn.close()
+
+    assert declared == {
+        "emp_id": "INTEGER",
+        "role": "TEXT",
+        "years": "INTEGER",
+        "score": "REAL",
+        "memo": "TEXT",
+    }
+    assert staging == 0
+
+
+def test_aggregate_filters_on_typed_values(loaded):
+    result = hr_db.aggregate(group_by="role", filters="years=5")
+    assert result["total"] == 2
+    assert sorted(result["groups"]) == [("Backend", 1), ("QA", 1)]
+
+    assert hr_db.aggregate(filters="score=1")["total"] == 1
+    assert hr_db.aggregate(filters="role=Backend, years=3")["total"] == 1
+
+
+def test_filter_uses_column_index(loaded):
+    conn = hr_db.get_conn()
+    plan = conn.execute(
+        f'EXPLAIN QUERY PLAN SELECT COUNT(*) FROM "{loaded["table_name"]}" WHERE "years" = ?',
+        (5,),
+    ).fetchall()
+    conn.close()
+
+    assert any("USING COVERING INDEX" in row[-1] or "USING INDEX" in row[-1] for row in plan)
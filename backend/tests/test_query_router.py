@@ -0,0 +1,57 @@
+# backend/tests/test_query_router.py
+#
+# 실행: python -m pytest backend/tests
+#
+# centroid 경로로 분류된 규정 질문이 search_docs 로 가서 실제 문서를 찾는지
+
+import numpy as np
+import pytest
+
+pytest.importorskip("langchain_community")
+
+from backend.app import project_config, query_router
+
+
+class _FakeEmbeddings:
+    def embed_query(self, text):
+        return [1.0, 0.0, 0.0]
+
+
+@pytest.fixture
+def centroids(monkeypatch):
+    monkeypatch.setattr(query_router, "embeddings", _FakeEmbeddings())
+    monkeypatch.setattr(query_router, "_get_centroids", lambda: {
+        "policy": np.array([1.0, 0.0, 0.0], dtype=np.float32),
+        "smalltalk": np.array([0.0, 1.0, 0.0], dtype=np.float32),
+        "analysis": np.array([0.0, 0.0, 1.0], dtype=np.float32),
+    })
+
+
+def test_centroid_policy_routes_to_search_docs(centroids):
+    route = query_router._centroid_route(" 출산 전후 쉬는 기간이 궁금해 ")
+
+    assert route["target"] == "tools"
+    assert route["method"] == "centroid"
+    assert [(c["name"], c["args"]) for c in route["tool_calls"]] == [
+        ("search_docs", {"query": "출산 전후 쉬는 기간이 궁금해"}),
+    ]
+
+
+def test_centroid_policy_question_finds_documents(centroids, tmp_path, monkeypatch):
+    (tmp_path / "leave.txt").write_text(
+        "# 휴가 규정\n출산 전후 휴가는 90일을 부여한다.\n배우자 출산 휴가는 10일이다.\n",
+        encoding="utf-8",
+    )
+    (tmp_path / "security.txt").write_text(
+        "# 보안 규정\n외부 저장장치 사용을 금지한다.\n", encoding="utf-8"
+    )
+    monkeypatch.setattr(project_config, "DATA_DIR", tmp_path)
+    project_config.load_docs.cache_clear()
+
+    question = "출산 전후 쉬는 기간이 궁금해"
+    route = query_router._centroid_route(question)
+    _, artifact = project_config._search_docs(**route["tool_calls"][0]["args"])
+    project_config.load_docs.cache_clear()
+
+    assert [d["source"] for d in artifact["documents"]] == ["leave.txt"]
+    assert "90일" in artifact["documents"][0]["content"]
@@ -0,0 +1,37 @@
+# backend/tests/test_tool_cache.py
+#
+# cached_tool 의 cache key 정규화 범위
+
+import pytest
+
+pytest.importorskip("langchain_core")
+
+from backend.app.project_config import cached_tool
+
+
+def _counting_tool(name: str, normalize: bool):
+    calls = []
+
+    @cached_tool(name, lambda: 1, normalize=normalize)
+    def lookup(value: str):
+        calls.append(value)
+        return value
+
+    return lookup, calls
+
+
+def test_exact_arguments_are_not_merged():
+    lookup, calls = _counting_tool("test_exact", normalize=False)
+
+    assert lookup("TALENT") == "TALENT"
+    assert lookup("talent") == "talent"
+    assert lookup("TALENT") == "TALENT"
+    assert calls == ["TALENT", "talent"]
+
+
+def test_free_text_query_is_normalized():
+    lookup, calls = _counting_tool("test_normalized", normalize=True)
+
+    lookup("연차 규정")
+    lookup("  연차 규정 ")
+    assert calls == ["연차 규정"]
@@ -0,0 +1,85 @@
+# backend/tests/test_vector_store.py
+#
+# 실행: python -m pytest backend/tests
+#
+# 인제스트 빌드: 파싱/임베딩 동시 진행, source 교체
+
+import threading
+
+import pytest
+
+pytest.importorskip("faiss")
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from backend.app import vector_store
+
+
+class _FakeEmbeddings(Embeddings):
+    def embed_documents(self, texts):
+        return [self.embed_query(t) for t in texts]
+
+    def embed_query(self, text):
+        return [float(len(text)), float(sum(map(ord, text)) % 97), 1.0]
+
+
+@pytest.fixture
+def index_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(vector_store, "INDEX_PATH", tmp_path / "vector_index")
+    monkeypatch.setattr(vector_store, "embeddings", _FakeEmbeddings())
+    return tmp_path / "vector_index"
+
+
+def _rows(source: str, n: int):
+    for i in range(n):
+        yield Document(page_content=f"{source} row {i}", metadata={"source": source})
+
+
+def _sources_in_index() -> dict:
+    db = vector_store.load_vector_store()
+    counts: dict = {}
+    for doc_id in db.index_to_docstore_id.values():
+        source = db.docstore.search(doc_id).metadata["source"]
+        counts[source] = counts.get(source, 0) + 1
+    return counts
+
+
+def test_concurrent_builds_parse_outside_lock(index_dir):
+    # a 의 행 iterator 는 b 가 파싱을 시작할 때까지 기다림
+    # → 파싱이 _build_lock 안에서 돌면 b 가 시작하지 못해 a 가 timeout
+    b_started = threading.Event()
+    results = {}
+
+    def rows_a():
+        yield from _rows("a.csv", 2)
+        assert b_started.wait(timeout=10)
+        yield from _rows("a.csv", 1)
+
+    def rows_b():
+        b_started.set()
+        yield from _rows("b.csv", 2)
+
+    def build(name, rows, sources):
+        results[name] = vector_store.build_vector_store_from_documents(rows, sources)
+
+    threads = [
+        threading.Thread(target=build, args=("a", rows_a(), {"a.csv"})),
+        threading.Thread(target=build, args=("b", rows_b(), {"b.csv"})),
+    ]
+    threads[0].start()
+    threads[1].start()
+    for t in threads:
+        t.join(timeout=30)
+
+    assert results == {"a": 3, "b": 2}
+    assert _sources_in_index() == {"a.csv": 3, "b.csv": 2}
+
+
+def test_empty_reupload_removes_previous_vectors(index_dir):
+    assert vector_store.build_vector_store_from_documents(_rows("a.csv", 3), {"a.csv"}) == 3
+    assert vector_store.build_vector_store_from_documents(_rows("b.csv", 2), {"b.csv"}) == 2
+
+    assert vector_store.build_vector_store_from_documents(iter([]), {"a.csv"}) == 0
+
+    assert _sources_in_index() == {"b.csv": 2}
@@ -1,3 +1,4 @@
+import json
 import uuid
 import requests
 import streamlit as st
@@ -83,7 +84,12 @@ with st.sidebar:
         type=["pdf", "xlsx"]
     )
 
-    if uploaded_file:
+    # rerun 마다 같은 파일을 다시 올리지 않도록 업로드한 파일을 기억
+    upload_key = (
+        f"{uploaded_file.name}:{uploaded_file.size}" if uploaded_file else None
+    )
+
+    if uploaded_file and st.session_state.get("upload_key") != upload_key:
         files = {
             "file": (
                 uploaded_file.name,
@@ -96,10 +102,67 @@ with st.sidebar:
         resp = requests.post(url, files=files)
 
         if resp.ok:
-            st.success("파일 업로드 완료")
+            st.session_state.upload_key = upload_key
+            st.session_state.ingest_job_id = resp.json().get("job_id")
         else:
             st.error(resp.text)
 
+    # -------------------------------
+    # 인덱싱 작업 상태 (백그라운드 job)
+    # -------------------------------
+    job_id = st.session_state.get("ingest_job_id")
+    if job_id:
+        try:
+            job = requests.get(f"{API_BASE}/jobs/{job_id}", timeout=5).json()
+        except Exception:
+            job = {}
+
+        status = job.get("status", "unknown")
+        if status == "done":
+            st.success(
+                f"파일 인덱싱 완료 — row {job.get('rows_parsed', 0)}개 / "
+                f"chunk {job.get('chunks_embedded', 0)}개"
+            )
+        elif status == "failed":
+            st.error(f"파일 인덱싱 실패: {job.get('error')}")
+        else:
+            total = job.get("chunks_total") or 0
+            done = job.get("chunks_embedded") or 0
+            st.info(f"파일 인덱싱 중… ({job.get('stage', status)})")
+            if total:
+                st.progress(done / total, text=f"{done}/{total} chunks")
+            if st.button("진행 상황 새로고침"):
+                st.rerun()
+
+# ===============================
+# SSE (/graph/stream) 파서
+# ===============================
+NODE_LABELS = {
+    "memory": "대화 기록 정리 중",
+    "router": "질문 분류 중",
+    "agent": "질문 분석 중",
+    "tools": "자료 조회 중",
+    "vector_fallback": "사내 문서 검색 중",
+    "summarize": "답변 작성 중",
+}
+
+
+def iter_sse(resp):
+    """requests 스트리밍 응답 → (event, data) 튜플"""
+    event, data_lines = "message", []
+    for line in resp.iter_lines(decode_unicode=True):
+        if line is None:
+            continue
+        if not line:
+            if data_lines:
+                yield event, json.loads("\n".join(data_lines))
+            event, data_lines = "message", []
+        elif line.startswith("event:"):
+            event = line[len("event:"):].strip()
+        elif line.startswith("data:"):
+            data_lines.append(line[len("data:"):].strip())
+
+
 # ===============================
 # Chat History
 # ===============================
@@ -121,41 +184,63 @@ if prompt := st.chat_input("질문을 입력하세요"):
         st.markdown(prompt)
 
     # -------------------------------
-    # Graph Invoke (ONLY ENTRY POINT)
+    # Graph Stream (ONLY ENTRY POINT)
+    #  - node 전환 / tool 결과 / 답변 토큰을 받는 즉시 화면에 표시
     # -------------------------------
     sources = []
     graph_flow = []
     answer = ""
-    try:
-        payload = {
-            "question": prompt,
-            "thread_id": st.session_state.thread_id
-        }
+    with st.chat_message("assistant"):
+        status = st.status("🤖 AI 처리 중…", expanded=False)
+        answer_box = st.empty()
+        try:
+            payload = {
+                "question": prompt,
+                "thread_id": st.session_state.thread_id
+            }
+
+            with requests.post(
+                f"{API_BASE}/graph/stream",
+                json=payload,
+                stream=True,
+                timeout=420
+            ) as resp:
+                if resp.status_code == 429:
+                    retry_after = resp.headers.get("Retry-After", "잠시")
+                    raise RuntimeError(
+                        f"요청이 많아 대기 중입니다. {retry_after}초 후 다시 시도해 주세요."
+                    )
+                resp.raise_for_status()
+                resp.encoding = "utf-8"
+
+                for event, data in iter_sse(resp):
+                    if event == "node":
+                        status.update(label=f"🧭 {NODE_LABELS.get(data['node'], data['node'])}")
+                        status.write(f"▶ {data['node']}")
+                    elif event == "tool":
+                        status.write(f"🔧 {data['tool']} 결과 수신")
+                    elif event == "token":
+                        answer += data["text"]
+                        answer_box.markdown(answer + "▌")
+                    elif event == "done":
+                        if data.get("cache_hit"):
+                            status.write("⚡ 캐시된 답변을 사용했습니다.")
+                        answer = data.get("answer") or answer
+                        sources = data.get("sources", [])
+                        graph_flow = data.get("graph_flow", [])
+                    elif event == "error":
+                        raise RuntimeError(data.get("detail"))
+
+            status.update(label="✅ 처리 완료", state="complete")
+            st.session_state.graph_flow = graph_flow
+        except Exception as e:
+            print("sourcesException:::::::::::",sources)
+            status.update(label="⚠️ 처리 실패", state="error")
+            answer = f"⚠️ AI 처리 중 오류 발생\n\n`{e}`"
+            sources = []
+            graph_flow = None
 
-        resp = requests.post(
-            f"{API_BASE}/graph/invoke",
-            json=payload,
-            timeout=420
-        )
-        print("resp:::::::::::",resp)
-        resp.raise_for_status()
-
-        data = resp.json()
-        answer = data.get("answer", "")
-        sources = data.get("sources", [])
-        graph_flow = data.get("graph_flow", [])
-        #graph_flow = st.session_state.get("graph_flow") or []
-        print("data:::::::::::",data)
-        print("answer:::::::::::",answer)
-        print("sources:::::::::::",sources)
-        print("graph_flow1111111:::::::::::",graph_flow)
-
-        st.session_state.graph_flow = graph_flow
-    except Exception as e:
-        print("sourcesException:::::::::::",sources)
-        answer = f"⚠️ AI 처리 중 오류 발생\n\n`{e}`"
-        sources = []
-        graph_flow = None
+        answer_box.markdown(answer or "✅ 분석을 완료했습니다.")
 
     # -------------------------------
     # messages에 저장
@@ -163,11 +248,6 @@ if prompt := st.chat_input("질문을 입력하세요"):
     st.session_state.messages.append(
         {"role": "assistant", "content": answer}
     )
-    # -------------------------------
-    # Assistant Output
-    # -------------------------------
-    with st.chat_message("assistant"):
-        st.markdown(answer or "✅ 분석을 완료했습니다.")
 
     # -------------------------------
     # Graph Flow
@@ -193,21 +273,38 @@ if prompt := st.chat_input("질문을 입력하세요"):
         
         # ===============================
         # 📊 Role 별 인원수 Bar Chart
+        #  - 검색된 chunk 샘플이 아니라 HR 표 전체 데이터 기준 집계
         # ===============================
-        if sources:
-            st.subheader("🧑‍💼 직무(Role)별 인원 분포")
+        role_counts = {}
+        try:
+            agg = requests.get(
+                f"{API_BASE}/hr/aggregate",
+                params={"group_by": "role"},
+                timeout=10,
+            )
+            if agg.ok:
+                role_counts = {
+                    str(value): n for value, n in agg.json().get("groups", [])
+                }
+        except Exception:
+            pass
 
+        # HR 표가 없으면 검색된 source 에서 role 추출 (기존 방식)
+        if not role_counts and sources:
             roles = []
-
             for s in sources:
                 content = s.get("content", "")
                 match = re.search(r"role:\s*([^\n]+)", content)
                 if match:
                     roles.append(match.group(1).strip())
+            role_counts = dict(Counter(roles))
 
-            if roles:
+        if role_counts or sources:
+            st.subheader("🧑‍💼 직무(Role)별 인원 분포")
+
+            if role_counts:
                 df_roles = pd.DataFrame.from_dict(
-                    Counter(roles),
+                    role_counts,
                     orient="index",
                     columns=["count"]
                 ).sort_values("count", ascending=False)
@@ -215,7 +312,7 @@ if prompt := st.chat_input("질문을 입력하세요"):
                 st.bar_chart(df_roles)
             else:
                 st.caption("직무(role) 정보가 발견되지 않았습니다.")
-            
+
     else:
         print("22222222222222")
         st.caption("ℹ️ 이번 질문에는 Tool 호출이 필요하지 않았습니다.")